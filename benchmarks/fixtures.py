@@ -0,0 +1,120 @@
+import os
+import tempfile
+import uuid
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from caml.data_source import DataSource
+from caml.model import EvalModel
+from caml.packed import write_packed
+
+
+def random_proba(
+    rng: np.random.Generator,
+    n: int,
+    n_classes: int,
+) -> np.ndarray:
+    logits = rng.normal(scale=2.0, size=(n, n_classes)).astype(np.float32)
+    proba = np.exp(logits - logits.max(axis=1, keepdims=True))
+    proba /= proba.sum(axis=1, keepdims=True)
+    return proba
+
+
+class SyntheticSource(DataSource):
+    def __init__(
+        self,
+        n: int = 10000,
+        n_classes: int = 10,
+        seed: int = 0,
+    ):
+        super(SyntheticSource, self).__init__()
+        self.n = n
+        self.n_classes = n_classes
+        self.seed = seed
+
+    def samples(self) -> Tuple[list, Optional[list]]:
+        # Samples are row ids into the fixture model's precomputed outputs.
+        samples: Any = np.arange(self.n)
+        targets = np.random.default_rng(self.seed).integers(self.n_classes, size=self.n)
+        return samples, targets.tolist()
+
+    def sample_ids(
+        self,
+        samples: list,
+    ) -> list:
+        return [str(sample) for sample in np.asarray(samples).tolist()]
+
+    def create_dataset(
+        self,
+        samples: list,
+        targets: Optional[list] = None,
+    ) -> str:
+        tmp_dir = tempfile.mkdtemp()
+        # Each call writes its own shard so chunks and rounds merged into one dataset do not overwrite each other.
+        write_packed(os.path.join(tmp_dir, uuid.uuid4().hex), np.asarray(samples), targets)
+        return tmp_dir
+
+
+class SyntheticModel(EvalModel):
+    def __init__(
+        self,
+        n: int = 10000,
+        n_classes: int = 10,
+        dim: int = 16,
+        seed: int = 0,
+    ):
+        super(SyntheticModel, self).__init__()
+        rng = np.random.default_rng(seed)
+        self.proba = random_proba(rng, n, n_classes)
+        self.embeddings = rng.normal(size=(n, dim)).astype(np.float32)
+        self.seed = seed
+
+    def load_model(
+        self,
+        path: str,
+    ) -> None:
+        pass
+
+    def predict(
+        self,
+        X: list,
+    ) -> list:
+        return self.proba[X].argmax(axis=1).tolist()
+
+    def predict_proba(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        return self.proba[X]
+
+    def predict_proba_samples(
+        self,
+        X: list,
+        n_passes: int,
+    ) -> np.ndarray:
+        # Dropout passes are imitated by renormalised multiplicative noise around the fixed probabilities.
+        rng = np.random.default_rng(self.seed)
+        proba = self.proba[X][:, None, :] * rng.uniform(0.5, 1.5, size=(len(X), n_passes, self.proba.shape[1]))
+        return (proba / proba.sum(axis=2, keepdims=True)).astype(np.float32)
+
+    def embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        return self.embeddings[X]
+
+    def grad_embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        proba = self.proba[X].copy()
+        proba[np.arange(len(proba)), proba.argmax(axis=1)] -= 1
+        return (proba[:, :, None] * self.embeddings[X][:, None, :]).reshape(len(proba), -1)
+
+    def eval(
+        self,
+        pred: list,
+        y: list,
+    ) -> Tuple[str, float]:
+        return 'accuracy', float(np.mean(np.asarray(pred) == np.asarray(y)))
@@ -0,0 +1,62 @@
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+HEAVY_MODULES = ('clearml', 'numpy', 'torch', 'yacs', 'yaml')
+STATEMENTS = {
+    'init': 'from caml import init',
+    'execute': 'from caml import execute',
+}
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the caml entry points import within a time budget.')
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    failures: List[str] = []
+
+    for name, statement in STATEMENTS.items():
+        runs = [import_times(statement) for _ in range(args.repeat)]
+        # The best of several runs filters out noise from a cold filesystem cache.
+        caml_ms = min(run.get('caml', 0) for run in runs) / 1000
+        heavy = sorted(module for module in HEAVY_MODULES if module in runs[0])
+        results.append({'entry_point': name, 'caml_import_ms': caml_ms, 'heavy_modules': heavy})
+
+        if caml_ms > args.budget_ms:
+            failures.append(f'`{statement}` took {caml_ms:.1f} ms, over the {args.budget_ms} ms budget.')
+
+        if heavy:
+            failures.append(f'`{statement}` imported {heavy}.')
+
+    print(json.dumps(results, indent=2))
+
+    if failures:
+        sys.exit('\n'.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from caml.strategy.index import VectorIndex
+
+
+def clustered_vectors(
+    rng: np.random.Generator,
+    n: int,
+    dim: int,
+    n_clusters: int,
+) -> np.ndarray:
+    centers = rng.normal(scale=4.0, size=(n_clusters, dim))
+    vectors = centers[rng.integers(n_clusters, size=n)] + rng.normal(size=(n, dim))
+    return vectors.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare approximate vector indexes against brute force.')
+    parser.add_argument('--n-vectors', type=int, default=200000)
+    parser.add_argument('--n-queries', type=int, default=10000)
+    parser.add_argument('--dim', type=int, default=64)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--n-lists', type=int, default=256)
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = clustered_vectors(rng, args.n_vectors + args.n_queries, args.dim, args.n_lists)
+    vectors, queries = vectors[:args.n_vectors], vectors[args.n_vectors:]
+
+    brute = VectorIndex.get('brute')
+    brute.add(vectors)
+    start = time.perf_counter()
+    _, true_ids = brute.search(queries, args.k)
+    brute_latency = time.perf_counter() - start
+
+    results = [{
+        'index': 'brute',
+        'build_s': 0.0,
+        'search_s': brute_latency,
+        'recall': 1.0,
+    }]
+
+    for n_probe in args.n_probe:
+        index = VectorIndex.get('ivf', n_lists=args.n_lists, n_probe=n_probe, seed=args.seed)
+        start = time.perf_counter()
+        index.add(vectors)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, ids = index.search(queries, args.k)
+        latency = time.perf_counter() - start
+
+        hits = sum(len(np.intersect1d(found, true)) for found, true in zip(ids, true_ids))
+        results.append({
+            'index': f'ivf(n_lists={args.n_lists}, n_probe={n_probe})',
+            'build_s': build,
+            'search_s': latency,
+            'recall': hits / true_ids.size,
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fixtures import SyntheticModel, SyntheticSource
+from caml.backend import LocalBackend, set_backend
+from caml.config import Config
+from caml.strategy.strategy import Strategy
+from caml.task.query import DataQueryTask
+
+COMMITTEE_STRATEGIES = ('vote_entropy', 'kl_divergence')
+COMMITTEE_SIZE = 3
+STRATEGY_KWARGS: Dict[str, Dict[str, Any]] = {
+    'random': {'seed': 0},
+    'coreset': {'seed': 0},
+    'badge': {'seed': 0},
+    'stratified': {'base': 'entropy', 'seed': 0},
+}
+
+
+def best_time(
+    fn: Callable[[], Any],
+    repeat: int,
+) -> float:
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def bench_strategies(
+    sizes: List[int],
+    names: List[str],
+    n_samples: int,
+    n_classes: int,
+    dim: int,
+    repeat: int,
+) -> List[Dict[str, Any]]:
+    results = []
+
+    for size in sizes:
+        pool, targets = SyntheticSource(n=size, n_classes=n_classes).samples()
+        models = [SyntheticModel(n=size, n_classes=n_classes, dim=dim, seed=seed) for seed in range(COMMITTEE_SIZE)]
+
+        for name in names:
+            strategy = Strategy.get(name, **STRATEGY_KWARGS.get(name, {}))
+            model = models if name in COMMITTEE_STRATEGIES else models[0]
+
+            try:
+                seconds = best_time(lambda: strategy.query(pool, n_samples, model, targets), repeat)
+            finally:
+                strategy.close()
+
+            results.append({'benchmark': f'strategy/{name}', 'size': size, 'seconds': seconds})
+
+    return results
+
+
+def bench_config(repeat: int) -> List[Dict[str, Any]]:
+    config = Config({
+        'module': 'caml.strategy.uncertainty',
+        'name': 'Entropy',
+        'kwargs': {
+            'batch_size': 256,
+            'index_kwargs': {'block_size': 1024},
+            'model_conf': [{'module': 'builtins', 'name': 'dict', 'kwargs': {'seed': seed}} for seed in range(8)],
+        },
+    })
+    n_evals = 1000
+    seconds = best_time(lambda: [config.eval() for _ in range(n_evals)], repeat)
+    return [{'benchmark': 'config/eval', 'size': n_evals, 'seconds': seconds}]
+
+
+def bench_query_task(
+    size: int,
+    n_samples: int,
+    n_classes: int,
+    dim: int,
+    repeat: int,
+) -> List[Dict[str, Any]]:
+    fixtures = 'benchmarks.fixtures'
+    execution = {
+        'strategy': 'entropy',
+        'n_samples': n_samples,
+        'data_source_conf': {
+            'module': fixtures,
+            'name': 'SyntheticSource',
+            'kwargs': {'n': size, 'n_classes': n_classes},
+        },
+        'model_conf': {
+            'module': fixtures,
+            'name': 'SyntheticModel',
+            'kwargs': {'n': size, 'n_classes': n_classes, 'dim': dim},
+        },
+    }
+
+    with tempfile.TemporaryDirectory() as root:
+        # The local backend stands in for ClearML so the run needs no server.
+        set_backend(LocalBackend(root=root))
+        task = DataQueryTask(project_name='benchmarks', task_name='query', execution=execution)
+        seconds = best_time(task.run, repeat)
+        set_backend(None)
+
+    return [{'benchmark': 'task/query', 'size': size, 'seconds': seconds}]
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float,
+    min_delta: float,
+) -> List[str]:
+    expected = {(entry['benchmark'], entry['size']): entry['seconds'] for entry in baseline}
+    regressions = []
+
+    for entry in results:
+        key = (entry['benchmark'], entry['size'])
+
+        if key not in expected:
+            continue
+
+        entry['baseline_seconds'] = expected[key]
+        entry['ratio'] = entry['seconds'] / expected[key] if expected[key] else float('inf')
+
+        # Sub-millisecond benchmarks jitter by more than the tolerance, so small absolute changes are ignored.
+        if entry['ratio'] > 1 + tolerance and entry['seconds'] - expected[key] > min_delta:
+            regressions.append(
+                f'{key[0]} at size {key[1]} took {entry["seconds"]:.4f}s, '
+                f'{entry["ratio"]:.2f}x the baseline {expected[key]:.4f}s.'
+            )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time caml strategies, config evaluation and a query task.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--strategies', nargs='+', default=None)
+    parser.add_argument('--n-samples', type=int, default=100)
+    parser.add_argument('--n-classes', type=int, default=10)
+    parser.add_argument('--dim', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file.')
+    parser.add_argument('--baseline', default=os.path.join(os.path.dirname(__file__), 'baseline.json'))
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown relative to the baseline.')
+    parser.add_argument('--min-delta', type=float, default=0.002, help='Ignore slowdowns below this many seconds.')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    os.environ.setdefault('CAML_CACHE', '0')
+    names = args.strategies if args.strategies else sorted(Strategy.STRATEGIES)
+    results = bench_strategies(args.sizes, names, args.n_samples, args.n_classes, args.dim, args.repeat)
+    results += bench_config(args.repeat)
+    results += bench_query_task(min(args.sizes), args.n_samples, args.n_classes, args.dim, args.repeat)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+        regressions: List[str] = []
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta)
+    else:
+        regressions = []
+
+    output = json.dumps(results, indent=2)
+    print(output)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+
+    if regressions:
+        sys.exit('\n'.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
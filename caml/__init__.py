@@ -4,17 +4,34 @@ import argparse
 import os
 import warnings
 from enum import Enum
+from importlib import import_module
 from pathlib import Path
-from typing import List
-
-import yaml
-
-from .task.dl import EvalTask, TrainTask
-from .task.query import DataQueryTask
-from .task.task import Task
+from typing import Any, List
 
 REQUIREMENT_FILE = 'requirements.txt'
 TEMPLATE_EXT = '.tpl'
+PROFILE_FILE = 'caml.prof'
+PROFILE_TOP = 30
+
+# Task classes are resolved on first access so that `caml init` and `--help` never import heavy dependencies.
+_LAZY_ATTRS = {
+    'Task': '.task.task',
+    'TrainTask': '.task.dl',
+    'EvalTask': '.task.dl',
+    'DataQueryTask': '.task.query',
+    'ActiveLearningTask': '.task.loop',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        return getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
 
 
 class Cmd(str, Enum):
@@ -35,6 +52,7 @@ class ExecCmd(Cmd):
     TRAIN = 'train'
     EVAL = 'eval'
     QUERY = 'query'
+    LOOP = 'loop'
 
 
 def init():
@@ -73,8 +91,12 @@ def execute():
     parser.add_argument('cmd', choices=ExecCmd.choices())
     parser.add_argument('cfg_file', nargs='?')
     parser.add_argument('requirement_file', nargs='?')
+    parser.add_argument('--profile', action='store_true', help='Profile the task with cProfile.')
+    parser.add_argument('--profile-output', default=PROFILE_FILE, help='Where to dump the pstats data.')
     args = parser.parse_args()
 
+    import yaml
+
     if args.cfg_file:
         cfg_file = args.cfg_file
     else:
@@ -93,10 +115,35 @@ def execute():
             warnings.warn('Cannot find requirement file.')
 
     if args.cmd == ExecCmd.TRAIN:
-        task: Task = TrainTask(**config, requirement_file=requirement_file)
+        from .task.dl import TrainTask
+
+        task = TrainTask(**config, requirement_file=requirement_file)
     elif args.cmd == ExecCmd.EVAL:
+        from .task.dl import EvalTask
+
         task = EvalTask(**config, requirement_file=requirement_file)
     elif args.cmd == ExecCmd.QUERY:
+        from .task.query import DataQueryTask
+
         task = DataQueryTask(**config, requirement_file=requirement_file)
+    elif args.cmd == ExecCmd.LOOP:
+        from .task.loop import ActiveLearningTask
+
+        task = ActiveLearningTask(**config, requirement_file=requirement_file)
+
+    if not args.profile:
+        task.run()
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
 
-    task.run()
+    try:
+        task.run()
+    finally:
+        profiler.disable()
+        profiler.dump_stats(args.profile_output)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(PROFILE_TOP)
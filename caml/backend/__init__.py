@@ -0,0 +1,4 @@
+from .backend import (Backend, DatasetWriter, get_backend, register_backend,
+                      set_backend)
+from .clearml import ClearMLBackend
+from .local import LocalBackend
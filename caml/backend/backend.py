@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+BACKEND_ENV = 'CAML_BACKEND'
+BACKEND_ROOT_ENV = 'CAML_BACKEND_ROOT'
+DEFAULT_BACKEND = 'clearml'
+
+
+class DatasetWriter(ABC):
+    @abstractmethod
+    def add_files(
+        self,
+        path: str,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def upload(self) -> None:
+        pass
+
+    @abstractmethod
+    def finalize(self) -> str:
+        pass
+
+
+class Backend(ABC):
+    BACKENDS: Dict[str, Type[Backend]] = {}
+
+    @abstractmethod
+    def init_task(
+        self,
+        project_name: str,
+        task_name: str,
+        task_init: Dict[str, Any] = None,
+        requirements: List[Tuple[str, str]] = None,
+        requirement_file: str = None,
+        ignored_requirements: List[str] = None,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def connect(
+        self,
+        params: Dict[str, Any],
+        name: str,
+    ) -> None:
+        pass
+
+    def execute_remotely(
+        self,
+        queue_name: str,
+    ) -> None:
+        raise NotImplementedError(f'{type(self).__name__} cannot execute tasks remotely.')
+
+    @abstractmethod
+    def report_scalar(
+        self,
+        title: str,
+        series: str,
+        value: float,
+        iteration: int,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def get_dataset(
+        self,
+        id_: str,
+    ) -> str:
+        pass
+
+    def get_dataset_version(
+        self,
+        id_: str,
+    ) -> Optional[str]:
+        # None when an id always names the same content, which caches may then reuse by id alone.
+        return None
+
+    @abstractmethod
+    def create_dataset(self) -> DatasetWriter:
+        pass
+
+    @abstractmethod
+    def get_model(
+        self,
+        id_: str,
+    ) -> str:
+        pass
+
+    def get_model_version(
+        self,
+        id_: str,
+    ) -> Optional[str]:
+        return None
+
+    @abstractmethod
+    def upload_model(
+        self,
+        path: str,
+    ) -> None:
+        pass
+
+    @staticmethod
+    def get(
+        backend: str,
+        **kwargs: Any,
+    ) -> Backend:
+        if backend in Backend.BACKENDS:
+            return Backend.BACKENDS[backend](**kwargs)
+        else:
+            raise ValueError(f'Unsupported backend {backend}. Please use one of {Backend.BACKENDS}.')
+
+
+def register_backend(name):
+    def decorator(backend):
+        if name in Backend.BACKENDS:
+            raise ValueError(f'`{name}` is already registered.')
+
+        Backend.BACKENDS[name] = backend
+        return backend
+
+    return decorator
+
+
+_backend: Optional[Backend] = None
+
+
+def get_backend() -> Backend:
+    global _backend
+
+    if _backend is None:
+        name = os.environ.get(BACKEND_ENV, DEFAULT_BACKEND)
+        kwargs = {'root': os.environ[BACKEND_ROOT_ENV]} if BACKEND_ROOT_ENV in os.environ else {}
+        _backend = Backend.get(name, **kwargs)
+
+    return _backend
+
+
+def set_backend(backend: Optional[Backend]) -> None:
+    global _backend
+    _backend = backend
@@ -0,0 +1,157 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from .backend import Backend, DatasetWriter, register_backend
+
+
+class ClearMLDatasetWriter(DatasetWriter):
+    def __init__(self):
+        from clearml import Dataset as _Dataset
+
+        super(ClearMLDatasetWriter, self).__init__()
+        self.dataset = _Dataset.create(
+            use_current_task=True,
+        )
+
+    def add_files(
+        self,
+        path: str,
+    ) -> None:
+        self.dataset.add_files(path=path)
+
+    def upload(self) -> None:
+        self.dataset.upload()
+
+    def finalize(self) -> str:
+        self.dataset.finalize()
+        return self.dataset.id
+
+
+@register_backend(name='clearml')
+class ClearMLBackend(Backend):
+    @property
+    def _task(self):
+        from clearml import Task as _Task
+
+        return _Task.current_task()
+
+    def init_task(
+        self,
+        project_name: str,
+        task_name: str,
+        task_init: Dict[str, Any] = None,
+        requirements: List[Tuple[str, str]] = None,
+        requirement_file: str = None,
+        ignored_requirements: List[str] = None,
+    ) -> None:
+        from clearml import Task as _Task
+
+        for requirement in requirements if requirements else []:
+            _Task.add_requirements(*requirement)
+
+        if requirement_file:
+            _Task.add_requirements(requirement_file)
+
+        for ignored_requirement in ignored_requirements if ignored_requirements else []:
+            _Task.ignore_requirements(ignored_requirement)
+
+        _task_init = task_init if task_init else {}
+        _Task.init(
+            project_name=project_name,
+            task_name=task_name,
+            **_task_init,
+        )
+
+        if 'output_uri' in _task_init:
+            self._task.output_uri = _task_init['output_uri']
+
+    def connect(
+        self,
+        params: Dict[str, Any],
+        name: str,
+    ) -> None:
+        self._task.connect(params, name=name)
+
+    def execute_remotely(
+        self,
+        queue_name: str,
+    ) -> None:
+        self._task.execute_remotely(queue_name)
+
+    def report_scalar(
+        self,
+        title: str,
+        series: str,
+        value: float,
+        iteration: int,
+    ) -> None:
+        self._task.get_logger().report_scalar(
+            title=title,
+            series=series,
+            value=value,
+            iteration=iteration,
+        )
+
+    def get_dataset(
+        self,
+        id_: str,
+    ) -> str:
+        from clearml import Dataset as _Dataset
+
+        return _Dataset.get(id_).get_local_copy()
+
+    def get_dataset_version(
+        self,
+        id_: str,
+    ) -> Optional[str]:
+        from clearml import Dataset as _Dataset
+
+        dataset = _Dataset.get(id_)
+
+        # Finalized datasets never change; one still open is versioned by its files.
+        if dataset.is_final():
+            return None
+
+        entries = sorted((relpath, entry.hash) for relpath, entry in dataset.file_entries_dict.items())
+        return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+    def create_dataset(self) -> DatasetWriter:
+        return ClearMLDatasetWriter()
+
+    def get_model(
+        self,
+        id_: str,
+    ) -> str:
+        from clearml import Model as _Model
+
+        return _Model(id_).get_local_copy()
+
+    def get_model_version(
+        self,
+        id_: str,
+    ) -> Optional[str]:
+        from clearml import Model as _Model
+
+        # Weights can be replaced under the same model id, e.g. by update_weights on a live OutputModel, which moves
+        # the model's URI or its last update.
+        model = _Model(id_)
+        last_update = getattr(model._get_model_data(), 'last_update', None)
+        return f'{model.url}@{last_update}'
+
+    def upload_model(
+        self,
+        path: str,
+    ) -> None:
+        from clearml import OutputModel as _OutputModel
+
+        # Task.update_output_model uploads in a background thread and deletes the file afterwards, so the caller could
+        # neither retry a failed upload nor know when the file is no longer read.
+        task = self._task
+        model = _OutputModel(task=task, name=task.name)
+        model.connect(task=task)
+        model.update_weights(
+            weights_filename=path,
+            auto_delete_file=False,
+            async_enable=False,
+        )
@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from caml.materialize import hash_files, materialize
+
+from .backend import Backend, DatasetWriter, register_backend
+
+DATASETS_DIR = 'datasets'
+MODELS_DIR = 'models'
+TASKS_DIR = 'tasks'
+TASK_FILE = 'task.json'
+SCALARS_FILE = 'scalars.jsonl'
+
+
+class LocalDatasetWriter(DatasetWriter):
+    def __init__(
+        self,
+        root: Path,
+    ):
+        super(LocalDatasetWriter, self).__init__()
+        self.id = uuid.uuid4().hex
+        self.path = root.joinpath(DATASETS_DIR, self.id)
+        self.path.mkdir(parents=True)
+
+    def add_files(
+        self,
+        path: str,
+    ) -> None:
+        source = Path(path)
+
+        if source.is_dir():
+            files = [(str(file), file.relative_to(source).as_posix()) for file in source.rglob('*') if file.is_file()]
+            materialize(files, output_dir=str(self.path), reference_dirs=[path])
+        else:
+            materialize([(path, source.name)], output_dir=str(self.path))
+
+    def upload(self) -> None:
+        hash_files(str(self.path))
+
+    def finalize(self) -> str:
+        return self.id
+
+
+@register_backend(name='local')
+class LocalBackend(Backend):
+    def __init__(
+        self,
+        root: str = None,
+    ):
+        super(LocalBackend, self).__init__()
+        self.root = Path(root if root else os.getcwd())
+        self.task_dir: Optional[Path] = None
+
+    def _write_task(
+        self,
+        **fields: Any,
+    ) -> None:
+        if self.task_dir is None:
+            raise RuntimeError('No task has been initialized.')
+
+        task_file = self.task_dir.joinpath(TASK_FILE)
+        task = json.loads(task_file.read_text()) if task_file.exists() else {}
+        task.update(fields)
+        task_file.write_text(json.dumps(task, indent=2, default=str))
+
+    def init_task(
+        self,
+        project_name: str,
+        task_name: str,
+        task_init: Dict[str, Any] = None,
+        requirements: List[Tuple[str, str]] = None,
+        requirement_file: str = None,
+        ignored_requirements: List[str] = None,
+    ) -> None:
+        self.task_dir = self.root.joinpath(TASKS_DIR, uuid.uuid4().hex)
+        self.task_dir.mkdir(parents=True)
+        self._write_task(
+            project_name=project_name,
+            task_name=task_name,
+            task_init=task_init if task_init else {},
+            started=time.time(),
+        )
+
+    def connect(
+        self,
+        params: Dict[str, Any],
+        name: str,
+    ) -> None:
+        self._write_task(**{name: params})
+
+    def report_scalar(
+        self,
+        title: str,
+        series: str,
+        value: float,
+        iteration: int,
+    ) -> None:
+        if self.task_dir is None:
+            raise RuntimeError('No task has been initialized.')
+
+        scalar = {'title': title, 'series': series, 'value': value, 'iteration': iteration}
+
+        with self.task_dir.joinpath(SCALARS_FILE).open(mode='a') as f:
+            f.write(json.dumps(scalar) + '\n')
+
+    def get_dataset(
+        self,
+        id_: str,
+    ) -> str:
+        path = self.root.joinpath(DATASETS_DIR, id_)
+
+        if not path.is_dir():
+            raise FileNotFoundError(f'Dataset {id_} does not exist in {self.root}.')
+
+        return str(path)
+
+    def create_dataset(self) -> DatasetWriter:
+        return LocalDatasetWriter(self.root)
+
+    def get_model(
+        self,
+        id_: str,
+    ) -> str:
+        model_dir = self.root.joinpath(MODELS_DIR, id_)
+        files = sorted(model_dir.iterdir()) if model_dir.is_dir() else []
+
+        if len(files) != 1:
+            raise FileNotFoundError(f'Model {id_} must be a single file in {model_dir}.')
+
+        return str(files[0])
+
+    def upload_model(
+        self,
+        path: str,
+    ) -> None:
+        id_ = uuid.uuid4().hex
+        model_dir = self.root.joinpath(MODELS_DIR, id_)
+        model_dir.mkdir(parents=True)
+        shutil.copy2(path, model_dir)
+
+        if self.task_dir is not None:
+            self._write_task(output_model=id_)
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from caml.backend import get_backend
+from caml.instrument import span
+from caml.materialize import Linker, hash_file, hash_files, materialize
+
+CACHE_ENV = 'CAML_CACHE'
+CACHE_DIR_ENV = 'CAML_CACHE_DIR'
+CACHE_SIZE_ENV = 'CAML_CACHE_SIZE'
+DEFAULT_CACHE_DIR = Path.home().joinpath('.cache', 'caml')
+DEFAULT_MAX_BYTES = 20 << 30
+
+DATASET = 'dataset'
+MODEL = 'model'
+
+
+def hash_path(path: Path) -> str:
+    # Per-file hashes recorded in a materialization manifest are reused when the files are unchanged.
+    hashes = hash_files(str(path), save=False) if path.is_dir() else {path.name: hash_file(path)}
+    digest = hashlib.sha256()
+
+    for relpath, file_hash in sorted(hashes.items()):
+        digest.update(f'{relpath}\0{file_hash}\n'.encode())
+
+    return digest.hexdigest()
+
+
+def make_read_only(path: Path) -> None:
+    files = [p for p in path.rglob('*') if p.is_file()] if path.is_dir() else [path]
+
+    for file in files:
+        mode = stat.S_IMODE(file.stat().st_mode)
+        file.chmod(mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def path_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+
+    return path.stat().st_size
+
+
+class ArtifactCache:
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        super(ArtifactCache, self).__init__()
+        self.root = Path(root) if root else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+        for name in ('objects', 'refs', 'locks', 'tmp'):
+            self.root.joinpath(name).mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _lock(
+        self,
+        name: str,
+    ) -> Iterator[None]:
+        with self.root.joinpath('locks', f'{name}.lock').open(mode='a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _key(
+        self,
+        kind: str,
+        id_: str,
+        version: Optional[str] = None,
+    ) -> str:
+        # Artifacts that can change under the same id are cached per version; older versions age out by LRU.
+        if version is None:
+            return f'{kind}-{id_}'
+
+        return f'{kind}-{id_}-{hashlib.sha256(version.encode()).hexdigest()[:16]}'
+
+    def _ref(
+        self,
+        key: str,
+    ) -> Path:
+        return self.root.joinpath('refs', f'{key}.json')
+
+    def lookup(
+        self,
+        kind: str,
+        id_: str,
+        version: Optional[str] = None,
+    ) -> Optional[str]:
+        ref = self._ref(self._key(kind, id_, version))
+
+        try:
+            entry = json.loads(ref.read_text())
+        except (OSError, ValueError):
+            return None
+
+        path = self.root.joinpath('objects', entry['hash'], entry['name'])
+
+        if not path.exists():
+            return None
+
+        # The ref's mtime is the entry's last access time for LRU eviction.
+        os.utime(ref)
+        return str(path)
+
+    def get(
+        self,
+        kind: str,
+        id_: str,
+        fetch: Callable[[], str],
+        version: Optional[str] = None,
+    ) -> str:
+        path = self.lookup(kind, id_, version)
+
+        if path is not None:
+            return path
+
+        key = self._key(kind, id_, version)
+
+        with self._lock(key):
+            path = self.lookup(kind, id_, version)
+
+            if path is None:
+                path = self._populate(key, Path(fetch()))
+
+        self.evict(keep=path)
+        return path
+
+    def _populate(
+        self,
+        key: str,
+        source: Path,
+    ) -> str:
+        digest = hash_path(source)
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.root.joinpath('tmp')))
+        target = tmp_dir.joinpath(source.name)
+
+        # Entries are cloned, never hardlinked, so making them read-only leaves the backend's files alone and a later
+        # change to those files cannot alter a stored object. Reflinks keep the clone free where supported.
+        if source.is_dir():
+            files = [
+                (os.fspath(file), file.relative_to(source).as_posix())
+                for file in source.rglob('*')
+                if file.is_file()
+            ]
+            materialize(files, output_dir=str(target), mode='clone')
+        else:
+            Linker('clone')(source, target)
+
+        make_read_only(target)
+        size = path_size(target)
+        object_dir = self.root.joinpath('objects', digest)
+
+        try:
+            os.rename(tmp_dir, object_dir)
+        except OSError:
+            # Another process already stored identical content.
+            shutil.rmtree(tmp_dir)
+
+        entry = {'hash': digest, 'name': source.name, 'size': size}
+        ref = self._ref(key)
+        tmp_ref = ref.with_name(f'{ref.name}.{os.getpid()}.tmp')
+        tmp_ref.write_text(json.dumps(entry))
+        os.replace(tmp_ref, ref)
+        return str(object_dir.joinpath(source.name))
+
+    def evict(
+        self,
+        keep: str = None,
+    ) -> None:
+        if self.max_bytes is None:
+            return
+
+        with self._lock('evict'):
+            entries = []
+
+            for ref in self.root.joinpath('refs').glob('*.json'):
+                try:
+                    entries.append((ref.stat().st_mtime, ref, json.loads(ref.read_text())))
+                except (OSError, ValueError):
+                    continue
+
+            sizes = {entry['hash']: entry['size'] for _, _, entry in entries}
+            total = sum(sizes.values())
+
+            for _, ref, entry in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+
+                object_dir = self.root.joinpath('objects', entry['hash'])
+
+                if keep is not None and Path(keep).parent == object_dir:
+                    continue
+
+                trash = self.root.joinpath('tmp', f'evict-{uuid.uuid4().hex}')
+
+                # The entry's lock keeps a concurrent get() from populating it while it is removed, and the rename
+                # makes the object disappear at once instead of file by file under a reader.
+                with self._lock(ref.stem):
+                    ref.unlink(missing_ok=True)
+
+                    if entry['hash'] not in sizes:
+                        continue
+
+                    try:
+                        os.rename(object_dir, trash)
+                    except OSError:
+                        continue
+
+                    total -= sizes.pop(entry['hash'])
+
+                shutil.rmtree(trash, ignore_errors=True)
+
+    def warm(
+        self,
+        dataset_ids: List[str] = None,
+        model_ids: List[str] = None,
+    ) -> None:
+        backend = get_backend()
+
+        for id_ in dataset_ids if dataset_ids else []:
+            self.get(DATASET, id_, lambda: backend.get_dataset(id_), backend.get_dataset_version(id_))
+
+        for id_ in model_ids if model_ids else []:
+            self.get(MODEL, id_, lambda: backend.get_model(id_), backend.get_model_version(id_))
+
+
+_cache: Optional[ArtifactCache] = None
+
+
+def get_cache() -> Optional[ArtifactCache]:
+    global _cache
+
+    if os.environ.get(CACHE_ENV, '1') == '0':
+        return None
+
+    if _cache is None:
+        max_bytes = os.environ.get(CACHE_SIZE_ENV)
+        _cache = ArtifactCache(
+            root=os.environ.get(CACHE_DIR_ENV),
+            max_bytes=int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES,
+        )
+
+    return _cache
+
+
+def set_cache(cache: Optional[ArtifactCache]) -> None:
+    global _cache
+    _cache = cache
+
+
+def get_dataset(id_: str) -> str:
+    cache = get_cache()
+
+    with span('dataset_fetch'):
+        backend = get_backend()
+
+        if cache is None:
+            return backend.get_dataset(id_)
+
+        return cache.get(DATASET, id_, lambda: backend.get_dataset(id_), backend.get_dataset_version(id_))
+
+
+def get_model(id_: str) -> str:
+    cache = get_cache()
+
+    with span('model_fetch'):
+        backend = get_backend()
+
+        if cache is None:
+            return backend.get_model(id_)
+
+        return cache.get(MODEL, id_, lambda: backend.get_model(id_), backend.get_model_version(id_))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-warm the local artifact cache.')
+    parser.add_argument('--dataset', nargs='*', default=[])
+    parser.add_argument('--model', nargs='*', default=[])
+    args = parser.parse_args()
+
+    cache = get_cache()
+
+    if cache is None:
+        raise RuntimeError(f'The artifact cache is disabled by {CACHE_ENV}=0.')
+
+    cache.warm(dataset_ids=args.dataset, model_ids=args.model)
+
+
+if __name__ == '__main__':
+    main()
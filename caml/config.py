@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import builtins
+import json
 import warnings
+from functools import lru_cache
 from importlib import import_module
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 import yaml
 from yacs.config import CfgNode
 
+from caml.instrument import span
+
 Keyword = CfgNode()
 Keyword.NOT_EVAL = CfgNode()
 Keyword.NOT_EVAL.MODULE = 'module'
@@ -15,38 +20,100 @@ Keyword.MODULE = Keyword.NOT_EVAL.MODULE
 Keyword.NAME = Keyword.NOT_EVAL.NAME
 Keyword.KWARGS = 'kwargs'
 
+PLAN_CACHE_SIZE = 1024
 
-def _eval(
-    config: Any,
-    globals_: Dict[str, Any] = None,
-    locals_: Dict[str, Any] = None,
-) -> Any:
-    if isinstance(config, dict):
-        for key, value in config.items():
-            if key not in Keyword.NOT_EVAL.values():
-                config[key] = _eval(value, globals_, locals_)
+Plan = Callable[[Optional[Dict[str, Any]]], Any]
+
+_plans: Dict[str, Plan] = {}
+
+
+@lru_cache(maxsize=None)
+def resolve(
+    module: str,
+    name: str,
+) -> Callable[..., Any]:
+    attrs = name.split('.')
+
+    if not all(attr.isidentifier() for attr in attrs):
+        raise ValueError(f'`{name}` in module {module} is not a dotted attribute name.')
+
+    obj: Any = import_module(module)
 
+    if not hasattr(obj, attrs[0]) and hasattr(builtins, attrs[0]):
+        obj = builtins
+
+    for attr in attrs:
+        obj = getattr(obj, attr)
+
+    return obj
+
+
+def _key(config: Any) -> str:
+    return json.dumps(config, sort_keys=True, default=repr)
+
+
+def _compile(config: Any) -> Plan:
+    if isinstance(config, dict):
         if Keyword.MODULE in config and Keyword.NAME in config:
-            module = config.pop(Keyword.MODULE)
-            name = config.pop(Keyword.NAME)
-            config_kwargs = config.pop(Keyword.KWARGS, {})
+            module = config[Keyword.MODULE]
+            name = config[Keyword.NAME]
+            redundant = [key for key in config if key not in (Keyword.MODULE, Keyword.NAME, Keyword.KWARGS)]
 
-            if config:
-                warnings.warn(f'Redundant keys {list(config.keys())} in module {module}, name {name}.')
+            if redundant:
+                warnings.warn(f'Redundant keys {redundant} in module {module}, name {name}.')
 
-            return eval(name, {}, vars(import_module(module)))(**config_kwargs)
+            factory = resolve(module, name)
+            kwargs_plan = _compile(config.get(Keyword.KWARGS, {}))
+            key = _key(config)
 
-    elif isinstance(config, list):
-        config = list(map(lambda ele: _eval(ele, globals_, locals_), config))
+            def construct(memo: Optional[Dict[str, Any]]) -> Any:
+                if memo is None:
+                    return factory(**kwargs_plan(memo))
 
-    return config
+                if key not in memo:
+                    memo[key] = factory(**kwargs_plan(memo))
+
+                return memo[key]
+
+            return construct
+
+        item_plans = [(key, _compile(value)) for key, value in config.items()]
+
+        def build_node(memo: Optional[Dict[str, Any]]) -> CfgNode:
+            node = CfgNode()
+            node.update((key, plan(memo)) for key, plan in item_plans)
+            return node
+
+        return build_node
+
+    if isinstance(config, list):
+        element_plans = [_compile(element) for element in config]
+        return lambda memo: [plan(memo) for plan in element_plans]
+
+    return lambda memo: config
 
 
 class Config(CfgNode):
-    def eval(self) -> Any:
-        config = org_config = self.clone()
-        config = _eval(config, None, org_config)
-        return config
+    def compile(self) -> Plan:
+        key = _key(self)
+        plan = _plans.get(key)
+
+        if plan is None:
+            plan = _compile(self)
+
+            if len(_plans) >= PLAN_CACHE_SIZE:
+                _plans.pop(next(iter(_plans)))
+
+            _plans[key] = plan
+
+        return plan
+
+    def eval(
+        self,
+        memo: Dict[str, Any] = None,
+    ) -> Any:
+        with span('config_eval'):
+            return self.compile()(memo)
 
     @staticmethod
     def load(file: str) -> Config:
@@ -1,5 +1,19 @@
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+def sample_id(sample: Any) -> str:
+    if isinstance(sample, np.ndarray):
+        # str() abbreviates large arrays, so distinct arrays would share an id; they are identified by content.
+        array = np.ascontiguousarray(sample)
+        digest = hashlib.sha1(f'{array.shape}{array.dtype.str}'.encode())
+        digest.update(array.data)
+        return digest.hexdigest()
+
+    return str(sample)
 
 
 class DataSource(ABC):
@@ -7,10 +21,66 @@ class DataSource(ABC):
     def samples(self) -> Tuple[list, Optional[list]]:
         pass
 
+    def iter_samples(
+        self,
+        chunk_size: int,
+    ) -> Iterator[Tuple[list, Optional[list]]]:
+        # The whole pool is loaded by samples(); sources too large for memory must override iter_samples or derive
+        # from IndexedDataSource to stream it.
+        samples, targets = self.samples()
+
+        for start in range(0, len(samples), chunk_size):
+            end = start + chunk_size
+            yield samples[start:end], targets[start:end] if targets else None
+
+    def sample_ids(
+        self,
+        samples: list,
+    ) -> List[str]:
+        return [sample_id(sample) for sample in samples]
+
     @abstractmethod
     def create_dataset(
         self,
         samples: list,
-        targets: list = None,
+        targets: Optional[list] = None,
     ) -> str:
         pass
+
+
+class IndexedDataSource(DataSource):
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def get_item(
+        self,
+        index: int,
+    ) -> Tuple[Any, Any]:
+        pass
+
+    def items(
+        self,
+        start: int,
+        end: int,
+    ) -> Tuple[list, Optional[list]]:
+        # get_item returns a (sample, target) pair, with a None target for unlabelled samples.
+        items = [self.get_item(i) for i in range(start, min(end, len(self)))]
+        targets = [target for _, target in items]
+        return [sample for sample, _ in items], targets if any(target is not None for target in targets) else None
+
+    def samples(self) -> Tuple[list, Optional[list]]:
+        return self.items(0, len(self))
+
+    def iter_samples(
+        self,
+        chunk_size: int,
+    ) -> Iterator[Tuple[list, Optional[list]]]:
+        for start in range(0, len(self), chunk_size):
+            yield self.items(start, start + chunk_size)
+
+
+def has_own_sample_ids(data_source: DataSource) -> bool:
+    # The default ids are only as stable as the samples' str() or content, e.g. temporary file paths change per run.
+    return type(data_source).sample_ids is not DataSource.sample_ids
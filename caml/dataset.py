@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Optional, cast
 
-from clearml import Dataset as _Dataset
+from caml.cache import get_dataset
+from caml.instrument import span
+from caml.lineage import lineage_paths, merge_view
 
 
 class Dataset(ABC):
@@ -11,13 +14,19 @@ class Dataset(ABC):
         path: str = None,
         id_: str = None,
     ):
-        if id_ is not None:
-            self.path = _Dataset.get(id_).get_local_copy()
-        elif path is not None:
-            self.path = path
-        else:
+        if id_ is None and path is None:
             raise ValueError('Must specify `path` or `id_`.')
 
+        self.id = id_
+        self._path: Optional[str] = path if id_ is None else None
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = get_dataset(cast(str, self.id))
+
+        return self._path
+
     @abstractmethod
     def X(self) -> list:
         pass
@@ -34,4 +43,8 @@ class Dataset(ABC):
         pass
 
     def load(self) -> None:
-        self.load_dataset(self.path)
+        # Ancestors are fetched only here, and a multi-round dataset is presented as one merged directory.
+        path = merge_view(lineage_paths(self.path))
+
+        with span('dataset_load'):
+            self.load_dataset(path)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from caml.backend import Backend
+
+MB = 1 << 20
+
+
+class Span(NamedTuple):
+    name: str
+    wall: float
+    cpu: float
+    rss_growth: int
+    peak_traced: Optional[int]
+
+
+def peak_rss() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class Recorder:
+    def __init__(
+        self,
+        trace_memory: bool = False,
+    ):
+        super(Recorder, self).__init__()
+        self.trace_memory = trace_memory
+        self.spans: List[Span] = []
+        self.lock = threading.Lock()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+    ) -> Iterator[None]:
+        # The traced peak is reset at span start, so a nested span resets its parent's peak as well.
+        if self.trace_memory and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        # ru_maxrss is the process's lifetime peak, so a span reports how far it raised that peak.
+        rss = peak_rss()
+
+        try:
+            yield
+        finally:
+            record = Span(
+                name=name,
+                wall=time.perf_counter() - wall,
+                cpu=time.process_time() - cpu,
+                rss_growth=peak_rss() - rss,
+                peak_traced=tracemalloc.get_traced_memory()[1] if self.trace_memory else None,
+            )
+
+            with self.lock:
+                self.spans.append(record)
+
+    def report(
+        self,
+        backend: Backend,
+    ) -> None:
+        occurrences: Counter = Counter()
+
+        with self.lock:
+            spans = list(self.spans)
+
+        for record in spans:
+            iteration = occurrences[record.name]
+            occurrences[record.name] += 1
+            title = f'Span: {record.name}'
+            backend.report_scalar(title=title, series='wall_s', value=record.wall, iteration=iteration)
+            backend.report_scalar(title=title, series='cpu_s', value=record.cpu, iteration=iteration)
+            backend.report_scalar(
+                title=title,
+                series='rss_growth_mb',
+                value=record.rss_growth / MB,
+                iteration=iteration,
+            )
+
+            if record.peak_traced is not None:
+                backend.report_scalar(
+                    title=title,
+                    series='peak_traced_mb',
+                    value=record.peak_traced / MB,
+                    iteration=iteration,
+                )
+
+
+_recorder: Optional[Recorder] = None
+
+
+def get_recorder() -> Optional[Recorder]:
+    return _recorder
+
+
+def set_recorder(recorder: Optional[Recorder]) -> None:
+    global _recorder
+    _recorder = recorder
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    recorder = _recorder
+
+    if recorder is None:
+        yield
+    else:
+        with recorder.span(name):
+            yield
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from caml.cache import get_dataset
+from caml.data_source import DataSource, has_own_sample_ids
+from caml.materialize import materialize
+
+LINEAGE_FILE = '.caml_lineage.json'
+# The strategy's vector index is stored with each round so the next round can reuse it.
+INDEX_FILE = '.caml_index.npz'
+PARENT = 'parent'
+IDS = 'ids'
+# Every id labelled up to and including the round, so a query reads its parent's lineage and no further.
+LABELLED = 'labelled'
+
+
+def read_lineage(path: str) -> Dict[str, Any]:
+    try:
+        return json.loads(Path(path).joinpath(LINEAGE_FILE).read_text())
+    except (OSError, ValueError):
+        return {PARENT: None, IDS: []}
+
+
+def write_lineage(
+    ids: List[str],
+    parent: Optional[str] = None,
+    path: Optional[str] = None,
+) -> str:
+    tmp_dir = path if path else tempfile.mkdtemp()
+    labelled = sorted(labelled_ids(parent).union(ids))
+    Path(tmp_dir).joinpath(LINEAGE_FILE).write_text(json.dumps({PARENT: parent, IDS: ids, LABELLED: labelled}))
+    return tmp_dir
+
+
+def lineage_paths(path: str) -> List[str]:
+    paths = [path]
+    parent = read_lineage(path)[PARENT]
+
+    while parent is not None:
+        paths.append(get_dataset(parent))
+        parent = read_lineage(paths[-1])[PARENT]
+
+    return paths[::-1]
+
+
+def labelled_ids(dataset_id: Optional[str]) -> Set[str]:
+    if dataset_id is None:
+        return set()
+
+    ids: Set[str] = set()
+    parent: Optional[str] = dataset_id
+
+    # Rounds written before cumulative ids were recorded are walked back through their parents.
+    while parent is not None:
+        lineage = read_lineage(get_dataset(parent))
+
+        if LABELLED in lineage:
+            return ids.union(lineage[LABELLED])
+
+        ids.update(lineage[IDS])
+        parent = lineage[PARENT]
+
+    return ids
+
+
+def check_sample_ids(data_source: DataSource) -> None:
+    if not has_own_sample_ids(data_source):
+        warnings.warn(
+            f'{type(data_source).__name__} does not define its own sample ids, so samples labelled in earlier '
+            'rounds may not be recognized and selected again.'
+        )
+
+
+def merge_view(paths: List[str]) -> str:
+    if len(paths) == 1:
+        return paths[0]
+
+    files: Dict[str, str] = {}
+
+    # Symlinks keep the merge free of copies; a file that two rounds both write would hide one of them.
+    for path in paths:
+        root = Path(path)
+
+        for file in root.rglob('*'):
+            if not file.is_file() or file.name in (LINEAGE_FILE, INDEX_FILE):
+                continue
+
+            relpath = file.relative_to(root).as_posix()
+
+            if relpath in files:
+                raise ValueError(
+                    f'`{relpath}` exists in both {files[relpath]} and {file}. '
+                    'Data sources must give every round of a lineage distinct file names.'
+                )
+
+            files[relpath] = os.fspath(file)
+
+    return materialize([(src, relpath) for relpath, src in files.items()], mode='symlink')
@@ -0,0 +1,259 @@
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+MANIFEST_DIR_ENV = 'CAML_MANIFEST_DIR'
+DEFAULT_MANIFEST_DIR = Path.home().joinpath('.cache', 'caml', 'manifests')
+PRUNE_STAMP = '.pruned'
+PRUNE_INTERVAL = 3600
+HASH_CHUNK_SIZE = 1 << 20
+LINK_MODES = ('auto', 'clone', 'reflink', 'hardlink', 'symlink', 'copy')
+FICLONE = 0x40049409
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS, errno.EPERM}
+
+
+def _reflink(
+    src: Path,
+    dst: Path,
+) -> None:
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, 'Reflinks are only supported on Linux.')
+
+    import fcntl
+
+    with src.open(mode='rb') as fs, dst.open(mode='wb') as fd:
+        fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+
+
+def _hardlink(
+    src: Path,
+    dst: Path,
+) -> None:
+    os.link(src, dst)
+
+
+def _symlink(
+    src: Path,
+    dst: Path,
+) -> None:
+    os.symlink(src.resolve(), dst)
+
+
+def _copy(
+    src: Path,
+    dst: Path,
+) -> None:
+    shutil.copy2(src, dst)
+
+
+LINKERS = {
+    'reflink': _reflink,
+    'hardlink': _hardlink,
+    'symlink': _symlink,
+    'copy': _copy,
+}
+
+
+class Linker:
+    def __init__(
+        self,
+        mode: str = 'auto',
+    ):
+        super(Linker, self).__init__()
+
+        if mode not in LINK_MODES:
+            raise ValueError(f'Unsupported mode {mode}. Please use one of {LINK_MODES}.')
+
+        if mode == 'auto':
+            self.modes = ['reflink', 'hardlink', 'copy']
+        elif mode == 'clone':
+            # Never shares the source's inode, so the output can change permissions or content independently.
+            self.modes = ['reflink', 'copy']
+        else:
+            self.modes = [mode]
+        self.unsupported: Set[str] = set()
+
+    def __call__(
+        self,
+        src: Path,
+        dst: Path,
+    ) -> str:
+        # Writing through an existing link would modify the file it shares an inode with.
+        if dst.is_symlink() or dst.exists():
+            dst.unlink()
+
+        for mode in self.modes:
+            if mode in self.unsupported:
+                continue
+
+            try:
+                LINKERS[mode](src, dst)
+                return mode
+            except OSError as e:
+                if mode == self.modes[-1]:
+                    raise
+
+                dst.unlink(missing_ok=True)
+
+                # Remember filesystem-level failures so later files skip straight to the next mode.
+                if e.errno in UNSUPPORTED_ERRNOS:
+                    self.unsupported.add(mode)
+
+        raise OSError(f'Cannot materialize {src} with any of {self.modes}.')
+
+
+def _entry(path: Path) -> Dict[str, Any]:
+    stat = path.stat()
+    return {'dev': stat.st_dev, 'ino': stat.st_ino, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def manifest_dir() -> Path:
+    return Path(os.environ.get(MANIFEST_DIR_ENV, DEFAULT_MANIFEST_DIR))
+
+
+def manifest_path(directory: str) -> Path:
+    # Manifests are kept apart from the directories they describe, so uploads never include them and temporary or
+    # backend-owned directories are left as they were written.
+    root = Path(directory).resolve()
+    return manifest_dir().joinpath(f'{hashlib.sha256(os.fsencode(root)).hexdigest()}.json')
+
+
+def load_manifest(directory: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(manifest_path(directory).read_text())
+    except (OSError, ValueError):
+        return {}
+
+    return data['files'] if data.get('directory') == str(Path(directory).resolve()) else {}
+
+
+def save_manifest(
+    directory: str,
+    manifest: Dict[str, Dict[str, Any]],
+) -> None:
+    path = manifest_path(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps({'directory': str(Path(directory).resolve()), 'files': manifest}))
+    os.replace(tmp_path, path)
+    prune_manifests()
+
+
+def prune_manifests() -> None:
+    root = manifest_dir()
+    stamp = root.joinpath(PRUNE_STAMP)
+
+    try:
+        if time.time() - stamp.stat().st_mtime < PRUNE_INTERVAL:
+            return
+    except OSError:
+        pass
+
+    stamp.touch()
+
+    # Most materialized directories are temporary, so the manifests of directories that are gone are dropped.
+    for path in root.glob('*.json'):
+        try:
+            directory = json.loads(path.read_text())['directory']
+        except (OSError, ValueError, KeyError):
+            continue
+
+        if not os.path.isdir(directory):
+            path.unlink(missing_ok=True)
+
+
+def known_hashes(directories: Iterable[str]) -> Dict[Tuple[int, int, int, int], str]:
+    hashes = {}
+
+    for directory in directories:
+        for entry in load_manifest(directory).values():
+            if entry.get('sha256'):
+                hashes[(entry['dev'], entry['ino'], entry['size'], entry['mtime_ns'])] = entry['sha256']
+
+    return hashes
+
+
+def materialize(
+    files: Iterable[Tuple[str, str]],
+    output_dir: str = None,
+    mode: str = 'auto',
+    num_workers: int = 8,
+    reference_dirs: List[str] = None,
+) -> str:
+    output = Path(output_dir) if output_dir else Path(tempfile.mkdtemp())
+    pairs = [(Path(src), output.joinpath(relpath)) for src, relpath in files]
+
+    for parent in {dst.parent for _, dst in pairs}:
+        parent.mkdir(parents=True, exist_ok=True)
+
+    linker = Linker(mode)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        list(executor.map(lambda pair: linker(*pair), pairs))
+
+    # Links share the source inode, so hashes recorded for the sources stay valid for the outputs.
+    hashes = known_hashes(reference_dirs if reference_dirs else [])
+    manifest = load_manifest(str(output))
+
+    for _, dst in pairs:
+        entry = _entry(dst)
+        sha256 = hashes.get((entry['dev'], entry['ino'], entry['size'], entry['mtime_ns']))
+
+        if sha256:
+            entry['sha256'] = sha256
+
+        manifest[dst.relative_to(output).as_posix()] = entry
+
+    save_manifest(str(output), manifest)
+    return str(output)
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+
+    with path.open(mode='rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_files(
+    directory: str,
+    num_workers: int = 8,
+    save: bool = True,
+) -> Dict[str, str]:
+    root = Path(directory)
+    manifest = load_manifest(directory)
+    files = sorted(p for p in root.rglob('*') if p.is_file())
+    hashes: Dict[str, str] = {}
+    stale = []
+
+    for file in files:
+        relpath = file.relative_to(root).as_posix()
+        entry = manifest.get(relpath)
+        current = _entry(file)
+
+        if entry and entry.get('sha256') and all(entry.get(key) == value for key, value in current.items()):
+            hashes[relpath] = entry['sha256']
+        else:
+            manifest[relpath] = current
+            stale.append((relpath, file))
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        for (relpath, _), sha256 in zip(stale, executor.map(lambda item: hash_file(item[1]), stale)):
+            hashes[relpath] = sha256
+            manifest[relpath]['sha256'] = sha256
+
+    if stale and save:
+        save_manifest(directory, manifest)
+
+    return hashes
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Type
+
+import numpy as np
+
+EPS = 1e-12
+
+
+class Metric(ABC):
+    METRICS: Dict[str, Type[Metric]] = {}
+
+    @abstractmethod
+    def update(
+        self,
+        proba: np.ndarray,
+        y: np.ndarray,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def compute(self) -> Dict[str, float]:
+        pass
+
+    @staticmethod
+    def get(
+        metric: str,
+        **kwargs: Any,
+    ) -> Metric:
+        if metric in Metric.METRICS:
+            return Metric.METRICS[metric](**kwargs)
+        else:
+            raise ValueError(f'Unsupported metric {metric}. Please use one of {Metric.METRICS}.')
+
+
+def register_metric(name):
+    def decorator(metric):
+        if name in Metric.METRICS:
+            raise ValueError(f'`{name}` is already registered.')
+
+        Metric.METRICS[name] = metric
+        return metric
+
+    return decorator
+
+
+@register_metric(name='accuracy')
+class Accuracy(Metric):
+    def __init__(self):
+        super(Accuracy, self).__init__()
+        self.correct = 0
+        self.total = 0
+
+    def update(
+        self,
+        proba: np.ndarray,
+        y: np.ndarray,
+    ) -> None:
+        self.correct += int(np.count_nonzero(proba.argmax(axis=1) == y))
+        self.total += len(y)
+
+    def compute(self) -> Dict[str, float]:
+        return {'accuracy': self.correct / self.total if self.total else 0.0}
+
+
+@register_metric(name='confusion_matrix')
+class ConfusionMatrix(Metric):
+    def __init__(self):
+        super(ConfusionMatrix, self).__init__()
+        self.matrix = np.zeros((0, 0), dtype=np.int64)
+
+    def update(
+        self,
+        proba: np.ndarray,
+        y: np.ndarray,
+    ) -> None:
+        n_classes = proba.shape[1]
+
+        if not len(self.matrix):
+            self.matrix = np.zeros((n_classes, n_classes), dtype=np.int64)
+
+        # Rows are true classes and columns are predictions.
+        counts = np.bincount(y * n_classes + proba.argmax(axis=1), minlength=n_classes * n_classes)
+        self.matrix += counts.reshape(n_classes, n_classes)
+
+    def compute(self) -> Dict[str, float]:
+        true_positives = np.diag(self.matrix).astype(np.float64)
+        support = self.matrix.sum(axis=1)
+        predicted = self.matrix.sum(axis=0)
+        present = support > 0
+        recall = true_positives[present] / support[present]
+        f1 = 2 * true_positives / np.maximum(support + predicted, 1)
+        return {
+            'balanced_accuracy': float(recall.mean()) if len(recall) else 0.0,
+            'macro_f1': float(f1[present].mean()) if present.any() else 0.0,
+        }
+
+
+@register_metric(name='log_loss')
+class LogLoss(Metric):
+    def __init__(self):
+        super(LogLoss, self).__init__()
+        self.loss = 0.0
+        self.total = 0
+
+    def update(
+        self,
+        proba: np.ndarray,
+        y: np.ndarray,
+    ) -> None:
+        self.loss -= float(np.log(np.maximum(proba[np.arange(len(y)), y], EPS)).sum())
+        self.total += len(y)
+
+    def compute(self) -> Dict[str, float]:
+        return {'log_loss': self.loss / self.total if self.total else 0.0}
+
+
+@register_metric(name='auc')
+class AUC(Metric):
+    def __init__(
+        self,
+        n_bins: int = 1000,
+    ):
+        super(AUC, self).__init__()
+        self.n_bins = n_bins
+        self.positives = np.zeros((0, n_bins), dtype=np.int64)
+        self.negatives = np.zeros((0, n_bins), dtype=np.int64)
+
+    def update(
+        self,
+        proba: np.ndarray,
+        y: np.ndarray,
+    ) -> None:
+        n_classes = proba.shape[1]
+
+        if not len(self.positives):
+            self.positives = np.zeros((n_classes, self.n_bins), dtype=np.int64)
+            self.negatives = np.zeros((n_classes, self.n_bins), dtype=np.int64)
+
+        # One-vs-rest histograms of the class scores; each class owns a contiguous run of bins.
+        bins = np.minimum((proba * self.n_bins).astype(np.int64), self.n_bins - 1)
+        flat = bins + np.arange(n_classes) * self.n_bins
+        positive = y[:, None] == np.arange(n_classes)
+        size = n_classes * self.n_bins
+        self.positives += np.bincount(flat[positive], minlength=size).reshape(n_classes, self.n_bins)
+        self.negatives += np.bincount(flat[~positive], minlength=size).reshape(n_classes, self.n_bins)
+
+    def compute(self) -> Dict[str, float]:
+        n_positives = self.positives.sum(axis=1)
+        n_negatives = self.negatives.sum(axis=1)
+        valid = (n_positives > 0) & (n_negatives > 0)
+
+        if not valid.any():
+            return {'auc': 0.0}
+
+        # A positive beats every negative in lower bins and ties half of those in its own bin.
+        negatives_below = np.cumsum(self.negatives, axis=1) - self.negatives
+        wins = (self.positives * (negatives_below + 0.5 * self.negatives)).sum(axis=1)
+        auc = wins[valid] / (n_positives[valid] * n_negatives[valid])
+        return {'auc': float(auc.mean())}
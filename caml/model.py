@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
 
-from clearml import Model as _Model
+import numpy as np
+
+from caml.cache import get_model
+from caml.instrument import span
 
 
 class Model(ABC):
@@ -13,13 +16,14 @@ class Model(ABC):
         id_: str = None,
     ):
         if id_ is not None:
-            self.path = _Model(id_).get_local_copy()
+            self.path = get_model(id_)
         else:
             self.path = path
 
     def load(self) -> None:
         if self.path:
-            self.load_model(self.path)
+            with span('model_load'):
+                self.load_model(self.path)
 
     @abstractmethod
     def load_model(
@@ -28,8 +32,26 @@ class Model(ABC):
     ) -> None:
         pass
 
+    def state(self) -> Any:
+        raise NotImplementedError(f'{type(self).__name__} does not expose its weights in memory.')
+
+    def load_state(
+        self,
+        state: Any,
+    ) -> None:
+        raise NotImplementedError(f'{type(self).__name__} does not accept weights in memory.')
+
 
 class TrainModel(Model):
+    on_checkpoint: Optional[Callable[[str], None]] = None
+
+    def checkpoint(
+        self,
+        path: str,
+    ) -> None:
+        if self.on_checkpoint is not None:
+            self.on_checkpoint(path)
+
     @abstractmethod
     def fit(
         self,
@@ -55,9 +77,36 @@ class EvalModel(Model):
     def predict_proba(
         self,
         X: list,
-    ) -> list:
+    ) -> Union[list, np.ndarray]:
         pass
 
+    def predict_batches(
+        self,
+        X: list,
+        batch_size: int = 1024,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        for start in range(0, len(X), batch_size):
+            yield start, np.asarray(self.predict_proba(X[start:start + batch_size]))
+
+    def predict_proba_samples(
+        self,
+        X: list,
+        n_passes: int,
+    ) -> np.ndarray:
+        raise NotImplementedError(f'{type(self).__name__} does not support stochastic forward passes.')
+
+    def embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        raise NotImplementedError(f'{type(self).__name__} does not support embeddings.')
+
+    def grad_embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        raise NotImplementedError(f'{type(self).__name__} does not support gradient embeddings.')
+
     @abstractmethod
     def eval(
         self,
@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from caml.data_source import DataSource
+from caml.dataset import Dataset
+
+DATA_FILE = 'data.bin'
+OFFSETS_FILE = 'offsets.npy'
+LABELS_FILE = 'labels.npy'
+META_FILE = 'meta.json'
+
+FIXED = 'fixed'
+RECORDS = 'records'
+
+BYTES_TYPES = (bytes, bytearray, memoryview)
+
+
+class PackedRecords:
+    def __init__(
+        self,
+        data: np.ndarray,
+        offsets: np.ndarray,
+    ):
+        super(PackedRecords, self).__init__()
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(
+        self,
+        index: Union[int, slice],
+    ) -> Union[np.ndarray, PackedRecords, list]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+
+            if step == 1:
+                return PackedRecords(self.data, self.offsets[start:max(start, stop) + 1])
+
+            return [self.record(i) for i in range(start, stop, step)]
+
+        return self.record(index)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def record(
+        self,
+        index: int,
+    ) -> np.ndarray:
+        if index < 0:
+            index += len(self)
+
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+
+class ShardedSamples:
+    def __init__(
+        self,
+        shards: List[Union[np.ndarray, PackedRecords]],
+    ):
+        super(ShardedSamples, self).__init__()
+        self.shards: List[Any] = shards
+        # Samples stay in their shards' mappings; a global index is resolved through the shards' starting offsets.
+        self.offsets = np.cumsum([0] + [len(shard) for shard in shards])
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(
+        self,
+        index: Union[int, slice],
+    ) -> Union[np.ndarray, list]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+
+            if step == 1 and all(isinstance(shard, np.ndarray) for shard in self.shards):
+                first = int(np.searchsorted(self.offsets, start, side='right')) - 1
+                last = int(np.searchsorted(self.offsets, max(start, stop), side='left'))
+                parts = [
+                    shard[max(start - offset, 0):max(stop - offset, 0)]
+                    for shard, offset in zip(self.shards[first:last], self.offsets[first:last])
+                ]
+                return np.concatenate(parts) if parts else self.shards[0][:0]
+
+            return [self.sample(i) for i in range(start, stop, step)]
+
+        return self.sample(index)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for shard in self.shards:
+            yield from shard
+
+    def sample(
+        self,
+        index: int,
+    ) -> np.ndarray:
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError(f'Sample index {index} out of range.')
+
+        shard = int(np.searchsorted(self.offsets, index, side='right')) - 1
+        return self.shards[shard][index - self.offsets[shard]]
+
+
+class PackedWriter:
+    def __init__(
+        self,
+        path: str,
+    ):
+        super(PackedWriter, self).__init__()
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.joinpath(DATA_FILE).open(mode='wb')
+        self.format: Optional[str] = None
+        self.dtype: Optional[np.dtype] = None
+        self.shape: Optional[Tuple[int, ...]] = None
+        self.count = 0
+        self.offsets = [0]
+        self.labels: list = []
+
+    def __enter__(self) -> PackedWriter:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _check_format(
+        self,
+        sample: Any,
+    ) -> None:
+        if self.format is None:
+            if isinstance(sample, BYTES_TYPES):
+                self.format = RECORDS
+            else:
+                sample = np.asarray(sample)
+                self.format = FIXED
+                self.dtype = sample.dtype
+                self.shape = sample.shape
+        elif self.format == RECORDS and not isinstance(sample, BYTES_TYPES):
+            raise ValueError('Cannot mix byte records with array samples in one shard.')
+
+    def append(
+        self,
+        samples: Union[np.ndarray, Sequence[Any]],
+        labels: Optional[Sequence[Any]] = None,
+    ) -> None:
+        if labels is not None and len(labels) != len(samples):
+            raise ValueError(f'Got {len(samples)} samples but {len(labels)} labels.')
+
+        if self.count and (labels is None) == bool(self.labels):
+            raise ValueError('Either every append or none of them must carry labels.')
+
+        if not len(samples):
+            return
+
+        self._check_format(samples[0])
+
+        if self.format == FIXED:
+            array = np.asarray(samples)
+
+            if array.dtype != self.dtype or array.shape[1:] != self.shape:
+                raise ValueError(
+                    f'Samples of dtype {array.dtype} and shape {array.shape[1:]} do not match '
+                    f'the shard dtype {self.dtype} and shape {self.shape}.'
+                )
+
+            np.ascontiguousarray(array).tofile(self.file)
+        else:
+            for sample in samples:
+                self._check_format(sample)
+                self.file.write(sample)
+                self.offsets.append(self.offsets[-1] + len(memoryview(sample).cast('B')))
+
+        self.count += len(samples)
+
+        if labels is not None:
+            self.labels.extend(labels)
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+
+        self.file.close()
+        meta = {'format': self.format if self.format else FIXED, 'count': self.count}
+
+        if self.format == RECORDS:
+            np.save(self.path.joinpath(OFFSETS_FILE), np.asarray(self.offsets, dtype=np.int64))
+        elif self.dtype is not None and self.shape is not None:
+            meta['dtype'] = self.dtype.str
+            meta['shape'] = list(self.shape)
+
+        if self.labels:
+            np.save(self.path.joinpath(LABELS_FILE), np.asarray(self.labels))
+
+        # The meta file marks the shard as complete, so it is written last.
+        tmp_meta = self.path.joinpath(f'{META_FILE}.{os.getpid()}.tmp')
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, self.path.joinpath(META_FILE))
+
+
+def write_packed(
+    path: str,
+    samples: Union[np.ndarray, Sequence[Any]],
+    labels: Optional[Sequence[Any]] = None,
+) -> str:
+    with PackedWriter(path) as writer:
+        writer.append(samples, labels)
+
+    return path
+
+
+def open_packed(path: str) -> Tuple[Union[np.ndarray, PackedRecords], Optional[np.ndarray]]:
+    shard = Path(path)
+    meta = json.loads(shard.joinpath(META_FILE).read_text())
+    data_file = shard.joinpath(DATA_FILE)
+    labels_file = shard.joinpath(LABELS_FILE)
+    labels = np.load(labels_file, mmap_mode='r') if labels_file.exists() else None
+    X: Union[np.ndarray, PackedRecords]
+
+    if meta['format'] == RECORDS:
+        offsets = np.load(shard.joinpath(OFFSETS_FILE))
+        data = np.memmap(data_file, dtype=np.uint8, mode='r') if offsets[-1] else np.empty(0, dtype=np.uint8)
+        X = PackedRecords(data, offsets)
+    elif meta['count'] and 'dtype' in meta:
+        X = np.memmap(data_file, dtype=np.dtype(meta['dtype']), mode='r', shape=(meta['count'], *meta['shape']))
+    else:
+        X = np.empty((0, *meta.get('shape', [])), dtype=np.dtype(meta.get('dtype', 'u1')))
+
+    return X, labels
+
+
+def find_shards(path: str) -> List[str]:
+    root = Path(path)
+
+    if root.joinpath(META_FILE).exists():
+        return [str(root)]
+
+    return sorted(str(meta.parent) for meta in root.rglob(META_FILE))
+
+
+def load_packed(path: str) -> Tuple[Union[np.ndarray, PackedRecords, ShardedSamples], Optional[np.ndarray]]:
+    shards = [open_packed(shard) for shard in find_shards(path)]
+
+    if not shards:
+        raise ValueError(f'No packed shards found in {path}.')
+
+    if len(shards) == 1:
+        return shards[0]
+
+    labels = None
+
+    if all(shard_labels is not None for _, shard_labels in shards):
+        labels = np.concatenate([shard_labels for _, shard_labels in shards])
+
+    return ShardedSamples([X for X, _ in shards]), labels
+
+
+class PackedDataSource(DataSource):
+    def __init__(
+        self,
+        path: str,
+    ):
+        super(PackedDataSource, self).__init__()
+        self.path = path
+
+    def samples(self) -> Tuple[list, Optional[list]]:
+        X: Any
+        X, y = load_packed(self.path)
+        return X, y.tolist() if y is not None else None
+
+    def sample_ids(
+        self,
+        samples: list,
+    ) -> List[str]:
+        # Shards carry no names, so samples are identified by their content.
+        return [
+            hashlib.blake2b(np.ascontiguousarray(sample).data, digest_size=16).hexdigest()
+            for sample in samples
+        ]
+
+    def create_dataset(
+        self,
+        samples: list,
+        targets: Optional[list] = None,
+    ) -> str:
+        tmp_dir = tempfile.mkdtemp()
+        # Each call writes its own shard so chunks added to one dataset do not overwrite each other.
+        write_packed(os.path.join(tmp_dir, uuid.uuid4().hex), samples, targets)
+        return tmp_dir
+
+
+class PackedDataset(Dataset):
+    def __init__(
+        self,
+        path: str = None,
+        id_: str = None,
+    ):
+        super(PackedDataset, self).__init__(path=path, id_=id_)
+
+    def X(self) -> list:
+        return self._X
+
+    def y(self) -> list:
+        return self._y
+
+    def load_dataset(
+        self,
+        path: str,
+    ) -> None:
+        self._X: Any
+        self._y: Any
+        self._X, self._y = load_packed(path)
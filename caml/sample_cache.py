@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import fcntl
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+MAX_DIMS = 6
+# Per-item metadata: state, offset, nbytes, dtype char, ndim, then the shape.
+META_FIELDS = 5 + MAX_DIMS
+EMPTY, IN_MEMORY, SPILLED = 0, 1, 2
+# Header counters: bytes used in memory, bytes used in the spill file, hits, misses.
+RAM_USED, SPILL_USED, HITS, MISSES = range(4)
+ALIGNMENT = 64
+
+
+def _align(n: int) -> int:
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class SampleCache:
+    def __init__(
+        self,
+        n_items: int,
+        max_bytes: int,
+        spill_path: str = None,
+        spill_bytes: int = 0,
+    ):
+        super(SampleCache, self).__init__()
+        self.n_items = n_items
+        self.max_bytes = max_bytes
+        self.spill_path = spill_path
+        self.spill_bytes = spill_bytes if spill_path else 0
+        self.owner = os.getpid()
+
+        # Shared memory, unlike a per-process dict, is visible to every DataLoader worker.
+        self._meta_shm = shared_memory.SharedMemory(create=True, size=(4 + n_items * META_FIELDS) * 8)
+        self._data_shm = shared_memory.SharedMemory(create=True, size=max(max_bytes, 1))
+        self.lock_path = os.path.join(tempfile.gettempdir(), f'caml-{self._meta_shm.name.lstrip("/")}.lock')
+        self._attach()
+        self.header[:] = 0
+        self.meta[:] = 0
+
+        if spill_path and self.spill_bytes:
+            with open(spill_path, 'wb') as f:
+                f.truncate(self.spill_bytes)
+
+            self._open_spill(spill_path)
+
+    def _attach(self) -> None:
+        counters = np.ndarray((4 + self.n_items * META_FIELDS,), dtype=np.int64, buffer=self._meta_shm.buf)
+        self.header = counters[:4]
+        self.meta = counters[4:].reshape(self.n_items, META_FIELDS)
+        self.data = np.ndarray((self._data_shm.size,), dtype=np.uint8, buffer=self._data_shm.buf)
+        self.spill: Optional[np.ndarray] = None
+        self._thread_lock = threading.Lock()
+        self._lock_file: Optional[Any] = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # flock excludes other processes; threads of one process share the descriptor and need their own lock.
+        with self._thread_lock:
+            if self._lock_file is None:
+                self._lock_file = open(self.lock_path, 'a')
+
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _open_spill(
+        self,
+        path: str,
+    ) -> None:
+        self.spill = np.memmap(path, dtype=np.uint8, mode='r+', shape=(self.spill_bytes,))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            'n_items': self.n_items,
+            'max_bytes': self.max_bytes,
+            'spill_path': self.spill_path,
+            'spill_bytes': self.spill_bytes,
+            'owner': self.owner,
+            'lock_path': self.lock_path,
+            'meta_name': self._meta_shm.name,
+            'data_name': self._data_shm.name,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.n_items = state['n_items']
+        self.max_bytes = state['max_bytes']
+        self.spill_path = state['spill_path']
+        self.spill_bytes = state['spill_bytes']
+        self.owner = state['owner']
+        self.lock_path = state['lock_path']
+        # Workers share their parent's resource tracker, so attaching does not schedule an early unlink.
+        self._meta_shm = shared_memory.SharedMemory(name=state['meta_name'])
+        self._data_shm = shared_memory.SharedMemory(name=state['data_name'])
+        self._attach()
+
+        if self.spill_bytes:
+            self._open_spill(state['spill_path'])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.meta[:, 0]))
+
+    def stats(self) -> Dict[str, int]:
+        # Hit and miss counters are updated without the lock, so they are approximate under several workers.
+        return {
+            'items': len(self),
+            'bytes': int(self.header[RAM_USED]),
+            'spilled_bytes': int(self.header[SPILL_USED]),
+            'hits': int(self.header[HITS]),
+            'misses': int(self.header[MISSES]),
+        }
+
+    def lookup(
+        self,
+        index: int,
+    ) -> Optional[np.ndarray]:
+        entry = self.meta[index]
+        state = entry[0]
+
+        if state == EMPTY:
+            return None
+
+        offset, nbytes, dtype, ndim = (int(value) for value in entry[1:5])
+        arena = self.data if state == IN_MEMORY else self.spill
+
+        if arena is None:
+            return None
+
+        array = arena[offset:offset + nbytes].view(np.dtype(chr(dtype))).reshape(tuple(entry[5:5 + ndim]))
+        # Entries are shared by every process, so callers get a read-only view.
+        array.flags.writeable = False
+        return array
+
+    def put(
+        self,
+        index: int,
+        array: np.ndarray,
+    ) -> bool:
+        array = np.ascontiguousarray(array)
+
+        if array.ndim > MAX_DIMS or len(array.dtype.char) != 1 or array.dtype.hasobject:
+            return False
+
+        nbytes = array.nbytes
+        size = _align(nbytes)
+
+        # Entries are pinned once written; space is only reserved under the lock, the copy runs outside it.
+        with self._locked():
+            if self.meta[index, 0] != EMPTY:
+                return True
+
+            if self.header[RAM_USED] + size <= self.max_bytes:
+                state, arena_used = IN_MEMORY, RAM_USED
+            elif self.header[SPILL_USED] + size <= self.spill_bytes:
+                state, arena_used = SPILLED, SPILL_USED
+            else:
+                return False
+
+            offset = int(self.header[arena_used])
+            self.header[arena_used] += size
+
+        arena = self.data if state == IN_MEMORY else self.spill
+
+        if arena is None:
+            return False
+
+        arena[offset:offset + nbytes] = array.view(np.uint8).reshape(-1)
+        entry = self.meta[index]
+        entry[1:5] = (offset, nbytes, ord(array.dtype.char), array.ndim)
+        entry[5:5 + array.ndim] = array.shape
+        # The state is published last so readers never see a half-written entry.
+        entry[0] = state
+        return True
+
+    def get(
+        self,
+        index: int,
+        decode: Callable[[], np.ndarray],
+    ) -> np.ndarray:
+        array = self.lookup(index)
+
+        if array is not None:
+            self.header[HITS] += 1
+            return array
+
+        self.header[MISSES] += 1
+        array = np.asarray(decode())
+        self.put(index, array)
+        return array
+
+    def close(self) -> None:
+        self.spill = None
+        del self.header, self.meta, self.data
+
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+        for shm in (self._meta_shm, self._data_shm):
+            try:
+                shm.close()
+            except BufferError:
+                # Views handed out by lookup() still map the block; it is released once they are collected.
+                pass
+
+        if os.getpid() == self.owner:
+            self._meta_shm.unlink()
+            self._data_shm.unlink()
+
+            for path in (self.spill_path, self.lock_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from caml.cache import DEFAULT_CACHE_DIR, hash_path
+from caml.model import EvalModel
+
+SCORE_STORE_ENV = 'CAML_SCORE_STORE'
+SCORE_STORE_DIR_ENV = 'CAML_SCORE_STORE_DIR'
+SCORE_STORE_SIZE_ENV = 'CAML_SCORE_STORE_SIZE'
+DEFAULT_SCORE_STORE_DIR = DEFAULT_CACHE_DIR.joinpath('scores')
+DEFAULT_MAX_BYTES = 1 << 30
+# Bumped whenever the on-disk layout or the meaning of stored scores changes, which orphans every older table.
+FORMAT_VERSION = 1
+
+META_FILE = 'meta.json'
+KEYS_FILE = 'keys.{}.npy'
+SCORES_FILE = 'scores.{}.npy'
+
+# Strategy arguments that only change how scores are computed or used after scoring, not their values.
+EXECUTION_KWARGS = (
+    'batch_size',
+    'num_workers',
+    'start_method',
+    'member_threads',
+    'index',
+    'index_kwargs',
+    'index_path',
+    'dedup_radius',
+    'dedup_oversample',
+)
+
+
+def fingerprint(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def hash_ids(ids: List[str]) -> np.ndarray:
+    # 64-bit keys keep the index compact; a collision needs billions of samples to become likely.
+    digests = b''.join(hashlib.blake2b(str(id_).encode(), digest_size=8).digest() for id_ in ids)
+    return np.frombuffer(digests, dtype='<u8')
+
+
+def model_fingerprint(
+    model_conf: Union[Dict[str, Any], List[Dict[str, Any]]],
+    model: Union[EvalModel, List[EvalModel]],
+) -> Optional[str]:
+    confs = model_conf if isinstance(model_conf, list) else [model_conf]
+    models = model if isinstance(model, list) else [model]
+    parts = []
+
+    for conf, member in zip(confs, models):
+        # Without weights on disk there is nothing to identify the model by, so its scores are not stored.
+        if not member.path or not os.path.exists(member.path):
+            return None
+
+        # The config, including the model id or checkpoint path, keys the table along with the weights' content, so
+        # scores from another round's model are never reused.
+        parts.append([conf.get('module'), conf.get('name'), conf.get('kwargs', {}), hash_path(Path(member.path))])
+
+    return fingerprint(*parts)
+
+
+def strategy_fingerprint(
+    strategy: str,
+    strategy_kwargs: Dict[str, Any] = None,
+) -> str:
+    kwargs = strategy_kwargs if strategy_kwargs else {}
+    return fingerprint(strategy, {key: value for key, value in kwargs.items() if key not in EXECUTION_KWARGS})
+
+
+class ScoreTable:
+    def __init__(
+        self,
+        store: ScoreStore,
+        key: str,
+    ):
+        super(ScoreTable, self).__init__()
+        self.store = store
+        self.key = key
+        self.path = store.root.joinpath('tables', key)
+        self.pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self.hits = 0
+        self.misses = 0
+
+        with store._lock(key):
+            self.keys, self.scores = self._read()
+
+    def _read(self) -> Tuple[np.ndarray, np.ndarray]:
+        meta_path = self.path.joinpath(META_FILE)
+
+        try:
+            generation = json.loads(meta_path.read_text())['generation']
+            keys = np.load(self.path.joinpath(KEYS_FILE.format(generation)), mmap_mode='r')
+            scores = np.load(self.path.joinpath(SCORES_FILE.format(generation)), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return np.empty(0, dtype='<u8'), np.empty(0, dtype=np.float64)
+
+        # The meta file's mtime is the table's last access time for LRU eviction.
+        os.utime(meta_path)
+        return keys, scores
+
+    def lookup(
+        self,
+        keys: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if not len(self.keys):
+            return np.full(len(keys), np.nan), np.zeros(len(keys), dtype=bool)
+
+        # Keys are stored sorted, so a lookup is a binary search over the memory-mapped column.
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = np.asarray(self.keys[positions] == keys)
+        scores = np.where(found, self.scores[positions], np.nan)
+        return scores, found
+
+    def get(
+        self,
+        ids: List[str],
+        pool: list,
+        compute: Callable[[list], np.ndarray],
+    ) -> np.ndarray:
+        keys = hash_ids(ids)
+        scores, found = self.lookup(keys)
+        missing = np.flatnonzero(~found)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if len(missing):
+            subset = pool[missing] if isinstance(pool, np.ndarray) else [pool[i] for i in missing]
+            scores[missing] = np.asarray(compute(subset), dtype=np.float64)
+            self.pending.append((keys[missing], scores[missing]))
+
+        return scores
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+
+        new_keys = np.concatenate([keys for keys, _ in self.pending])
+        new_scores = np.concatenate([scores for _, scores in self.pending])
+        self.pending = []
+
+        with self.store._lock(self.key):
+            # Another process may have extended the table since it was opened, so merge into the latest version.
+            keys, scores = self._read()
+            merged_keys = np.concatenate([keys, new_keys])
+            merged_scores = np.concatenate([scores, new_scores])
+            # Reversed so np.unique keeps the newest score of a repeated key.
+            self.keys, first = np.unique(merged_keys[::-1], return_index=True)
+            self.scores = merged_scores[::-1][first]
+            self._write()
+
+        self.store.evict(keep=self.key)
+
+    def _write(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path.joinpath(META_FILE)
+
+        try:
+            generation = json.loads(meta_path.read_text())['generation'] + 1
+        except (OSError, ValueError, KeyError):
+            generation = 0
+
+        # Columns are written under a new generation and switched to by replacing the meta file, so readers
+        # never see keys and scores from different versions.
+        for name, column in ((KEYS_FILE, self.keys), (SCORES_FILE, self.scores)):
+            with self.path.joinpath(name.format(generation)).open(mode='wb') as f:
+                np.save(f, column)
+
+        meta = {'generation': generation, 'size': int(self.keys.nbytes + self.scores.nbytes)}
+        tmp_meta = meta_path.with_name(f'{META_FILE}.{os.getpid()}.tmp')
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, meta_path)
+
+        for path in self.path.glob('*.npy'):
+            if path.name not in (KEYS_FILE.format(generation), SCORES_FILE.format(generation)):
+                path.unlink(missing_ok=True)
+
+
+class ScoreStore:
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        super(ScoreStore, self).__init__()
+        self.root = Path(root) if root else DEFAULT_SCORE_STORE_DIR
+        self.max_bytes = max_bytes
+
+        for name in ('tables', 'locks'):
+            self.root.joinpath(name).mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _lock(
+        self,
+        name: str,
+    ) -> Iterator[None]:
+        with self.root.joinpath('locks', f'{name}.lock').open(mode='a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def open(
+        self,
+        model_key: str,
+        strategy_key: str,
+    ) -> ScoreTable:
+        return ScoreTable(self, fingerprint(FORMAT_VERSION, model_key, strategy_key))
+
+    def remove(
+        self,
+        key: str,
+    ) -> None:
+        with self._lock(key):
+            shutil.rmtree(self.root.joinpath('tables', key), ignore_errors=True)
+
+    def clear(self) -> None:
+        for path in self.root.joinpath('tables').iterdir():
+            self.remove(path.name)
+
+    def evict(
+        self,
+        keep: str = None,
+    ) -> None:
+        if self.max_bytes is None:
+            return
+
+        with self._lock('evict'):
+            entries = []
+
+            for meta_path in self.root.joinpath('tables').glob(f'*/{META_FILE}'):
+                try:
+                    meta = json.loads(meta_path.read_text())
+                    entries.append((meta_path.stat().st_mtime, meta_path.parent.name, meta))
+                except (OSError, ValueError):
+                    continue
+
+            total = sum(meta['size'] for _, _, meta in entries)
+
+            # Tables of superseded models are no longer read, so they age out first.
+            for _, key, meta in sorted(entries, key=lambda item: item[0]):
+                if total <= self.max_bytes:
+                    break
+
+                if key == keep:
+                    continue
+
+                self.remove(key)
+                total -= meta['size']
+
+
+_store: Optional[ScoreStore] = None
+
+
+def get_score_store() -> Optional[ScoreStore]:
+    global _store
+
+    # Off by default: stored scores are only as trustworthy as the data source's sample ids.
+    if os.environ.get(SCORE_STORE_ENV, '0') != '1':
+        return None
+
+    if _store is None:
+        max_bytes = os.environ.get(SCORE_STORE_SIZE_ENV)
+        _store = ScoreStore(
+            root=os.environ.get(SCORE_STORE_DIR_ENV),
+            max_bytes=int(max_bytes) if max_bytes else DEFAULT_MAX_BYTES,
+        )
+
+    return _store
+
+
+def set_score_store(store: Optional[ScoreStore]) -> None:
+    global _store
+    _store = store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the persistent sample score store.')
+    parser.add_argument('--clear', action='store_true', help='Remove every stored score table.')
+    args = parser.parse_args()
+
+    store = get_score_store()
+
+    if store is None:
+        raise RuntimeError(f'The score store is disabled, set {SCORE_STORE_ENV}=1 to enable it.')
+
+    if args.clear:
+        store.clear()
+
+
+if __name__ == '__main__':
+    main()
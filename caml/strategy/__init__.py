@@ -1 +1,6 @@
+from .badge import Badge
+from .committee import KLDivergence, VoteEntropy
+from .coreset import CoreSet
 from .random import Random
+from .stratified import Stratified
+from .uncertainty import BALD, Entropy, LeastConfidence, Margin
@@ -0,0 +1,81 @@
+from typing import Any, List
+
+import numpy as np
+
+from caml.model import EvalModel
+
+from .coreset import update_min_dist
+from .strategy import Strategy, register_strategy
+
+
+def k_means_pp_seeding(
+    X: np.ndarray,
+    k: int,
+    block_size: int = 8192,
+    rng: np.random.Generator = None,
+) -> np.ndarray:
+    n = len(X)
+    k = min(k, n)
+    rng = np.random.default_rng() if rng is None else rng
+
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    sq_norms = np.einsum('ij,ij->i', X, X)
+    min_dist = np.full(n, np.inf, dtype=np.float32)
+    selected = np.empty(k, dtype=np.int64)
+    # BADGE starts from the largest gradient embedding, i.e. the most uncertain sample.
+    next_index = int(np.argmax(sq_norms))
+
+    for i in range(k):
+        selected[i] = next_index
+        update_min_dist(X, sq_norms, min_dist, next_index, block_size)
+        min_dist[next_index] = 0.0
+
+        if i == k - 1:
+            break
+
+        # D² sampling by inverting the cumulative distribution, one O(N) pass per pick.
+        cumulative = np.cumsum(min_dist, dtype=np.float64)
+
+        if cumulative[-1] > 0:
+            next_index = int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side='right'))
+            next_index = min(next_index, n - 1)
+        else:
+            remaining = np.setdiff1d(np.arange(n), selected[:i + 1])
+            next_index = int(rng.choice(remaining))
+
+    return selected
+
+
+@register_strategy(name='badge')
+class Badge(Strategy):
+    def __init__(
+        self,
+        block_size: int = 8192,
+        seed: int = None,
+        **kwargs: Any,
+    ):
+        super(Badge, self).__init__(**kwargs)
+        self.block_size = block_size
+        self.seed = seed
+
+    def query(
+        self,
+        pool: list,
+        n_samples: int = None,
+        model: EvalModel = None,
+        targets: list = None,
+    ) -> List[int]:
+        if model is None:
+            raise ValueError(f'{type(self).__name__} requires a model.')
+
+        _n_samples = len(pool) if n_samples is None else n_samples
+        embeddings = self.grad_embed(pool, model)
+        selected = k_means_pp_seeding(
+            embeddings,
+            _n_samples,
+            block_size=self.block_size,
+            rng=np.random.default_rng(self.seed),
+        )
+        return selected.tolist()
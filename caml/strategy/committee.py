@@ -0,0 +1,119 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from typing import Any, List, Union
+
+import numpy as np
+
+from caml.model import EvalModel
+
+from .strategy import Strategy, register_strategy
+
+EPS = 1e-12
+
+
+def _entropy(proba: np.ndarray) -> np.ndarray:
+    return -(proba * np.log(np.maximum(proba, EPS))).sum(axis=1)
+
+
+class Committee(Strategy, ABC):
+    def __init__(
+        self,
+        member_threads: int = None,
+        **kwargs: Any,
+    ):
+        super(Committee, self).__init__(**kwargs)
+        self.member_threads = member_threads
+
+    def query(
+        self,
+        pool: list,
+        n_samples: int = None,
+        model: Union[EvalModel, List[EvalModel]] = None,
+        targets: list = None,
+    ) -> List[int]:
+        _n_samples = len(pool) if n_samples is None else n_samples
+        indices, _ = self.score_top_k(pool, _n_samples, model)
+        return indices.tolist()
+
+    def score(
+        self,
+        pool: list,
+        model: Union[EvalModel, List[EvalModel]] = None,
+    ) -> np.ndarray:
+        if model is None:
+            raise ValueError(f'{type(self).__name__} requires a committee of models.')
+
+        members = model if isinstance(model, list) else [model]
+
+        with ThreadPoolExecutor(max_workers=self.member_threads or len(members)) as executor:
+            return self.score_batches(pool, lambda batch: self.score_committee(batch, members, executor))
+
+    def score_committee(
+        self,
+        batch: list,
+        members: List[EvalModel],
+        executor: Executor,
+    ) -> np.ndarray:
+        futures = {executor.submit(member.predict_proba, batch) for member in members}
+        total = np.empty(0, dtype=np.float32)
+
+        # Members' statistics are summed as they finish, and each finished future is dropped along with its
+        # probabilities, so no member's output outlives its turn.
+        for i, future in enumerate(as_completed(futures)):
+            futures.discard(future)
+            statistics = self.member_statistics(np.asarray(future.result(), dtype=np.float32))
+            del future
+            total = statistics if i == 0 else np.add(total, statistics, out=total)
+
+        return self.score_statistics(total, len(members))
+
+    @abstractmethod
+    def member_statistics(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def score_statistics(
+        self,
+        total: np.ndarray,
+        n_members: int,
+    ) -> np.ndarray:
+        pass
+
+
+@register_strategy(name='vote_entropy')
+class VoteEntropy(Committee):
+    def member_statistics(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        votes = np.zeros_like(proba)
+        votes[np.arange(len(proba)), proba.argmax(axis=1)] = 1.0
+        return votes
+
+    def score_statistics(
+        self,
+        total: np.ndarray,
+        n_members: int,
+    ) -> np.ndarray:
+        return _entropy(total / n_members)
+
+
+@register_strategy(name='kl_divergence')
+class KLDivergence(Committee):
+    def member_statistics(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        # Mean KL(p_m || p_mean) = H(p_mean) - mean H(p_m), so the sums of p_m and H(p_m) suffice.
+        return np.concatenate([proba, _entropy(proba)[:, None]], axis=1)
+
+    def score_statistics(
+        self,
+        total: np.ndarray,
+        n_members: int,
+    ) -> np.ndarray:
+        mean = total / n_members
+        return _entropy(mean[:, :-1]) - mean[:, -1]
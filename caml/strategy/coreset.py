@@ -0,0 +1,99 @@
+from typing import Any, List, Optional
+
+import numpy as np
+
+from caml.model import EvalModel
+
+from .strategy import Strategy, register_strategy
+
+
+def update_min_dist(
+    X: np.ndarray,
+    sq_norms: np.ndarray,
+    min_dist: np.ndarray,
+    center_index: int,
+    block_size: int = 8192,
+) -> None:
+    center = X[center_index]
+    center_sq_norm = sq_norms[center_index]
+
+    # Only distances to the newest center change, so each pick is a single O(N·d) pass.
+    for start in range(0, len(X), block_size):
+        end = start + block_size
+        distances = sq_norms[start:end] - 2.0 * (X[start:end] @ center) + center_sq_norm
+        np.minimum(min_dist[start:end], np.maximum(distances, 0.0), out=min_dist[start:end])
+
+
+def k_center_greedy(
+    X: np.ndarray,
+    k: int,
+    min_dist: Optional[np.ndarray] = None,
+    block_size: int = 8192,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    n = len(X)
+    k = min(k, n)
+    rng = np.random.default_rng() if rng is None else rng
+
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    sq_norms = np.einsum('ij,ij->i', X, X)
+
+    if min_dist is not None and len(min_dist):
+        min_dist = np.array(min_dist, dtype=np.float32)
+        next_index = int(np.argmax(min_dist))
+    else:
+        min_dist = np.full(n, np.inf, dtype=np.float32)
+        next_index = int(rng.integers(n))
+
+    selected = np.empty(k, dtype=np.int64)
+
+    for i in range(k):
+        selected[i] = next_index
+        update_min_dist(X, sq_norms, min_dist, next_index, block_size)
+        min_dist[next_index] = -np.inf
+        next_index = int(np.argmax(min_dist))
+
+    return selected
+
+
+@register_strategy(name='coreset')
+class CoreSet(Strategy):
+    def __init__(
+        self,
+        block_size: int = 8192,
+        seed: int = None,
+        **kwargs: Any,
+    ):
+        super(CoreSet, self).__init__(**kwargs)
+        self.block_size = block_size
+        self.seed = seed
+
+    @property
+    def indexed(self) -> bool:
+        return True
+
+    def query(
+        self,
+        pool: list,
+        n_samples: int = None,
+        model: EvalModel = None,
+        targets: list = None,
+    ) -> List[int]:
+        if model is None:
+            raise ValueError(f'{type(self).__name__} requires a model.')
+
+        _n_samples = len(pool) if n_samples is None else n_samples
+        embeddings = self.embed(pool, model)
+        index = self.load_index(model)
+        min_dist = index.search(embeddings, 1)[0][:, 0] if len(index) else None
+        selected = k_center_greedy(
+            embeddings,
+            _n_samples,
+            min_dist=min_dist,
+            block_size=self.block_size,
+            rng=np.random.default_rng(self.seed),
+        )
+        self.update_index(index, embeddings[selected])
+        return selected.tolist()
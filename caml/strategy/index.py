@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple, Type
+
+import numpy as np
+
+
+def _squared_distances(
+    queries: np.ndarray,
+    vectors: np.ndarray,
+) -> np.ndarray:
+    distances = (
+        np.einsum('ij,ij->i', queries, queries)[:, None]
+        - 2.0 * (queries @ vectors.T)
+        + np.einsum('ij,ij->i', vectors, vectors)[None, :]
+    )
+    return np.maximum(distances, 0.0, out=distances)
+
+
+def _merge_top_k(
+    distances: np.ndarray,
+    ids: np.ndarray,
+    new_distances: np.ndarray,
+    new_ids: np.ndarray,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if k == 1 and distances.shape[1]:
+        nearest = new_distances.argmin(axis=1)[:, None]
+        nearest_distances = np.take_along_axis(new_distances, nearest, axis=1)
+        closer = nearest_distances < distances
+        return (
+            np.where(closer, nearest_distances, distances),
+            np.where(closer, np.take_along_axis(new_ids, nearest, axis=1), ids),
+        )
+
+    distances = np.concatenate([distances, new_distances], axis=1)
+    ids = np.concatenate([ids, new_ids], axis=1)
+
+    if distances.shape[1] > k:
+        keep = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        distances = np.take_along_axis(distances, keep, axis=1)
+        ids = np.take_along_axis(ids, keep, axis=1)
+
+    return distances, ids
+
+
+def _sort_rows(
+    distances: np.ndarray,
+    ids: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(distances, axis=1, kind='stable')
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def brute_force_search(
+    queries: np.ndarray,
+    vectors: np.ndarray,
+    k: int = 1,
+    block_size: int = 4096,
+) -> Tuple[np.ndarray, np.ndarray]:
+    queries = np.asarray(queries, dtype=np.float32)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(vectors))
+    distances = np.empty((len(queries), k), dtype=np.float32)
+    ids = np.empty((len(queries), k), dtype=np.int64)
+
+    for start in range(0, len(queries), block_size):
+        end = start + block_size
+        block_distances = np.empty((len(queries[start:end]), 0), dtype=np.float32)
+        block_ids = np.empty((len(queries[start:end]), 0), dtype=np.int64)
+
+        for vector_start in range(0, len(vectors), block_size):
+            new_distances = _squared_distances(queries[start:end], vectors[vector_start:vector_start + block_size])
+            new_ids = np.broadcast_to(
+                np.arange(vector_start, vector_start + new_distances.shape[1]),
+                new_distances.shape,
+            )
+            block_distances, block_ids = _merge_top_k(block_distances, block_ids, new_distances, new_ids, k)
+
+        distances[start:end], ids[start:end] = _sort_rows(block_distances, block_ids)
+
+    return distances, ids
+
+
+class VectorIndex(ABC):
+    INDEXES: Dict[str, Type[VectorIndex]] = {}
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def add(
+        self,
+        vectors: np.ndarray,
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        pass
+
+    @abstractmethod
+    def params(self) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def state(self) -> Dict[str, np.ndarray]:
+        pass
+
+    @abstractmethod
+    def load_state(
+        self,
+        state: Dict[str, np.ndarray],
+    ) -> None:
+        pass
+
+    def save(
+        self,
+        path: str,
+        key: Optional[str] = None,
+    ) -> None:
+        kind = next(name for name, index in VectorIndex.INDEXES.items() if index is type(self))
+        arrays: Dict[str, Any] = {
+            'kind': np.array(kind),
+            'params': np.array(json.dumps(self.params())),
+            'key': np.array(key if key else ''),
+            **self.state(),
+        }
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> VectorIndex:
+        with np.load(path) as data:
+            index = VectorIndex.get(str(data['kind']), **json.loads(str(data['params'])))
+            index.load_state({key: data[key] for key in data.files if key not in ('kind', 'params', 'key')})
+
+        return index
+
+    @staticmethod
+    def saved_key(path: str) -> Optional[str]:
+        with np.load(path) as data:
+            key = str(data['key']) if 'key' in data.files else ''
+
+        return key if key else None
+
+    @staticmethod
+    def get(
+        index: str,
+        **kwargs: Any,
+    ) -> VectorIndex:
+        if index in VectorIndex.INDEXES:
+            return VectorIndex.INDEXES[index](**kwargs)
+        else:
+            raise ValueError(f'Unsupported index {index}. Please use one of {VectorIndex.INDEXES}.')
+
+
+def register_index(name):
+    def decorator(index):
+        if name in VectorIndex.INDEXES:
+            raise ValueError(f'`{name}` is already registered.')
+
+        VectorIndex.INDEXES[name] = index
+        return index
+
+    return decorator
+
+
+@register_index(name='brute')
+class BruteForceIndex(VectorIndex):
+    def __init__(
+        self,
+        block_size: int = 4096,
+    ):
+        super(BruteForceIndex, self).__init__()
+        self.block_size = block_size
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def add(
+        self,
+        vectors: np.ndarray,
+    ) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.vectors = np.concatenate([self.vectors, vectors]) if len(self.vectors) else vectors.copy()
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return brute_force_search(queries, self.vectors, k, self.block_size)
+
+    def params(self) -> Dict[str, Any]:
+        return {'block_size': self.block_size}
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {'vectors': self.vectors}
+
+    def load_state(
+        self,
+        state: Dict[str, np.ndarray],
+    ) -> None:
+        self.vectors = state['vectors']
+
+
+@register_index(name='ivf')
+class IVFIndex(VectorIndex):
+    def __init__(
+        self,
+        n_lists: int = 256,
+        n_probe: int = 8,
+        n_iter: int = 10,
+        train_size: int = 65536,
+        block_size: int = 4096,
+        seed: int = None,
+    ):
+        super(IVFIndex, self).__init__()
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.train_size = train_size
+        self.block_size = block_size
+        self.seed = seed
+        self.centroids = np.empty((0, 0), dtype=np.float32)
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.lists = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def train(
+        self,
+        vectors: np.ndarray,
+    ) -> None:
+        rng = np.random.default_rng(self.seed)
+        n_lists = min(self.n_lists, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(self.train_size, len(vectors)), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            _, assignments = brute_force_search(sample, centroids, 1, self.block_size)
+            assignments = assignments[:, 0]
+            counts = np.bincount(assignments, minlength=n_lists)
+            non_empty = counts > 0
+
+            for dim in range(sample.shape[1]):
+                sums = np.bincount(assignments, weights=sample[:, dim], minlength=n_lists)
+                centroids[non_empty, dim] = sums[non_empty] / counts[non_empty]
+
+        self.centroids = centroids
+
+    def add(
+        self,
+        vectors: np.ndarray,
+    ) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        if not len(vectors):
+            return
+
+        if not len(self.centroids):
+            self.train(vectors)
+
+        _, assignments = brute_force_search(vectors, self.centroids, 1, self.block_size)
+        new_ids = np.arange(len(self), len(self) + len(vectors))
+        all_vectors = np.concatenate([self.vectors, vectors]) if len(self.vectors) else vectors
+        all_ids = np.concatenate([self.ids, new_ids])
+        all_lists = np.concatenate([self.lists, assignments[:, 0]])
+
+        order = np.argsort(all_lists, kind='stable')
+        self.vectors = all_vectors[order]
+        self.ids = all_ids[order]
+        self.lists = all_lists[order]
+        self.offsets = np.searchsorted(self.lists, np.arange(len(self.centroids) + 1))
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 1,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.asarray(queries, dtype=np.float32)
+        k = min(k, len(self))
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        if not k:
+            return distances, ids
+
+        _, probes = brute_force_search(queries, self.centroids, self.n_probe, self.block_size)
+
+        # Group (query, list) pairs by list so each inverted list is scanned with one matrix product.
+        query_ids = np.repeat(np.arange(len(queries)), probes.shape[1])
+        probe_lists = probes.ravel()
+        order = np.argsort(probe_lists, kind='stable')
+        query_ids = query_ids[order]
+        group_offsets = np.searchsorted(probe_lists[order], np.arange(len(self.centroids) + 1))
+
+        for list_id in range(len(self.centroids)):
+            list_start, list_end = self.offsets[list_id], self.offsets[list_id + 1]
+
+            if list_start == list_end:
+                continue
+
+            list_vectors = self.vectors[list_start:list_end]
+            list_ids = self.ids[list_start:list_end]
+            list_queries = query_ids[group_offsets[list_id]:group_offsets[list_id + 1]]
+
+            for start in range(0, len(list_queries), self.block_size):
+                block = list_queries[start:start + self.block_size]
+                new_distances = _squared_distances(queries[block], list_vectors)
+                new_ids = np.broadcast_to(list_ids, new_distances.shape)
+                distances[block], ids[block] = _merge_top_k(distances[block], ids[block], new_distances, new_ids, k)
+
+        return _sort_rows(distances, ids)
+
+    def params(self) -> Dict[str, Any]:
+        return {
+            'n_lists': self.n_lists,
+            'n_probe': self.n_probe,
+            'n_iter': self.n_iter,
+            'train_size': self.train_size,
+            'block_size': self.block_size,
+            'seed': self.seed,
+        }
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {
+            'centroids': self.centroids,
+            'vectors': self.vectors,
+            'ids': self.ids,
+            'lists': self.lists,
+            'offsets': self.offsets,
+        }
+
+    def load_state(
+        self,
+        state: Dict[str, np.ndarray],
+    ) -> None:
+        self.centroids = state['centroids']
+        self.vectors = state['vectors']
+        self.ids = state['ids']
+        self.lists = state['lists']
+        self.offsets = state['offsets']
+
+
+def suppress_duplicates(
+    embeddings: np.ndarray,
+    n_samples: int,
+    radius: float,
+    index: VectorIndex = None,
+    block_size: int = 256,
+) -> np.ndarray:
+    sq_radius = radius ** 2
+    chosen = BruteForceIndex()
+    selected: list = []
+
+    for start in range(0, len(embeddings), block_size):
+        block = embeddings[start:start + block_size]
+        keep = np.ones(len(block), dtype=bool)
+
+        for reference in (index, chosen):
+            if reference is not None and len(reference):
+                distances, _ = reference.search(block, 1)
+                keep &= distances[:, 0] > sq_radius
+
+        candidates = np.nonzero(keep)[0]
+        pairwise = _squared_distances(block[candidates], block[candidates])
+        accepted: list = []
+
+        for i in range(len(candidates)):
+            if not accepted or pairwise[i, accepted].min() > sq_radius:
+                accepted.append(i)
+
+        accepted = accepted[:n_samples - len(selected)]
+        selected.extend(start + candidates[accepted])
+        chosen.add(block[candidates[accepted]])
+
+        if len(selected) >= n_samples:
+            break
+
+    return np.asarray(selected, dtype=np.int64)
@@ -0,0 +1,148 @@
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from caml.config import Config
+from caml.model import EvalModel
+
+from .strategy import Strategy, top_k
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+_model: Optional[Union[EvalModel, List[EvalModel]]] = None
+_thread_limits: Any = None
+
+
+def _load_model(model_conf: Dict[str, Any]) -> EvalModel:
+    model = Config(model_conf).eval()
+    model.load()
+    return model
+
+
+def _init_worker(
+    model_conf: Union[Dict[str, Any], List[Dict[str, Any]]],
+    threads_per_worker: int,
+) -> None:
+    global _model, _thread_limits
+
+    # Only effective for libraries imported after this point, e.g. under the `spawn` start method.
+    for env_var in THREAD_ENV_VARS:
+        os.environ.setdefault(env_var, str(threads_per_worker))
+
+    # A forked worker inherits thread pools the parent's BLAS has already sized, so they are resized in place.
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        pass
+    else:
+        _thread_limits = threadpool_limits(limits=threads_per_worker)
+
+    torch = sys.modules.get('torch')
+
+    if torch is not None:
+        torch.set_num_threads(threads_per_worker)
+
+    if isinstance(model_conf, list):
+        _model = [_load_model(conf) for conf in model_conf]
+    else:
+        _model = _load_model(model_conf)
+
+
+def _worker_model() -> Union[EvalModel, List[EvalModel]]:
+    if _model is None:
+        raise RuntimeError('The scoring worker was not initialized with a model.')
+
+    return _model
+
+
+def _score_shard(
+    strategy: Strategy,
+    offset: int,
+    shard: list,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    scores = np.asarray(strategy.score(shard, _worker_model()), dtype=np.float64)
+    indices = top_k(scores, k)
+    return indices + offset, scores[indices]
+
+
+def _score_all(
+    strategy: Strategy,
+    shard: list,
+) -> np.ndarray:
+    return np.asarray(strategy.score(shard, _worker_model()), dtype=np.float64)
+
+
+class ParallelScorer:
+    def __init__(
+        self,
+        model_conf: Union[Dict[str, Any], List[Dict[str, Any]]],
+        num_workers: int,
+        shards_per_worker: int = 4,
+        threads_per_worker: int = 1,
+        start_method: str = None,
+    ):
+        super(ParallelScorer, self).__init__()
+        self.num_workers = num_workers
+        self.shards_per_worker = shards_per_worker
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(model_conf, threads_per_worker),
+        )
+
+    def shard_size(
+        self,
+        pool: list,
+    ) -> int:
+        return max(math.ceil(len(pool) / (self.num_workers * self.shards_per_worker)), 1)
+
+    def score(
+        self,
+        strategy: Strategy,
+        pool: list,
+    ) -> np.ndarray:
+        shard_size = self.shard_size(pool)
+        futures = [
+            self.executor.submit(_score_all, strategy, pool[start:start + shard_size])
+            for start in range(0, len(pool), shard_size)
+        ]
+        scores = [future.result() for future in futures]
+        return np.concatenate(scores) if scores else np.empty(0, dtype=np.float64)
+
+    def top_k(
+        self,
+        strategy: Strategy,
+        pool: list,
+        k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        shard_size = self.shard_size(pool)
+        futures = [
+            self.executor.submit(_score_shard, strategy, start, pool[start:start + shard_size], k)
+            for start in range(0, len(pool), shard_size)
+        ]
+
+        indices = []
+        scores = []
+
+        for future in futures:
+            shard_indices, shard_scores = future.result()
+            indices.append(shard_indices)
+            scores.append(shard_scores)
+
+        if not indices:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        candidate_indices = np.concatenate(indices)
+        candidate_scores = np.concatenate(scores)
+        keep = top_k(candidate_scores, k)
+        return candidate_indices[keep], candidate_scores[keep]
+
+    def close(self) -> None:
+        self.executor.shutdown()
@@ -1,19 +1,121 @@
-import random
-from typing import List
+import math
+from collections import deque
+from collections.abc import Sized
+from itertools import count
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
 
 from caml.model import EvalModel
 
 from .strategy import Strategy, register_strategy
 
 
+class Reservoir:
+    def __init__(
+        self,
+        k: int,
+        rng: np.random.Generator,
+    ):
+        super(Reservoir, self).__init__()
+        self.k = k
+        self.rng = rng
+        self.seen = 0
+        self.w = 1.0
+        self.next = math.inf
+
+        if k > 0:
+            self.w = math.exp(math.log(self._uniform()) / k)
+            self.next = k - 1
+            self._skip()
+
+    def _uniform(self) -> float:
+        return 1.0 - self.rng.random()
+
+    def _skip(self) -> None:
+        self.next += math.floor(math.log(self._uniform()) / math.log1p(-self.w)) + 1 if self.w < 1.0 else 1
+
+    def advance(
+        self,
+        n: int,
+    ) -> List[Tuple[int, int]]:
+        # Algorithm L: returns (slot, position) replacements among the next `n` items,
+        # drawing random numbers only per replacement rather than per item.
+        end = self.seen + n
+        replacements = [(position, position) for position in range(self.seen, min(end, self.k))]
+
+        while self.next < end:
+            replacements.append((int(self.rng.integers(self.k)), int(self.next)))
+            self.w *= math.exp(math.log(self._uniform()) / self.k)
+            self._skip()
+
+        self.seen = end
+        return replacements
+
+
 @register_strategy(name='random')
 class Random(Strategy):
+    def __init__(
+        self,
+        seed: int = None,
+        **kwargs: Any,
+    ):
+        super(Random, self).__init__(**kwargs)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
     def query(
         self,
-        pool: list,
+        pool: Iterable,
         n_samples: int = None,
-        model: EvalModel = None,
-    ) -> List[int]:
-        _n_samples = len(pool) if n_samples is None else n_samples
-        samples = random.sample(population=range(len(pool)), k=_n_samples)
-        return samples
+        model: Union[EvalModel, List[EvalModel]] = None,
+        targets: list = None,
+    ) -> np.ndarray:
+        if isinstance(pool, Sized):
+            n_items = len(pool)
+        else:
+            # Count an unsized pool in C without keeping its items.
+            last = deque(zip(count(1), pool), maxlen=1)
+            n_items = last[0][0] if last else 0
+
+        if n_samples is None:
+            return self.rng.permutation(n_items)
+
+        reservoir = Reservoir(n_samples, self.rng)
+        indices = np.empty(min(n_samples, n_items), dtype=np.int64)
+
+        for slot, position in reservoir.advance(n_items):
+            indices[slot] = position
+
+        return indices
+
+    def query_stream(
+        self,
+        chunks: Iterable[Tuple[list, Optional[list]]],
+        n_samples: int = None,
+        model: Union[EvalModel, List[EvalModel]] = None,
+    ) -> Tuple[list, Optional[list]]:
+        if n_samples is None:
+            return super(Random, self).query_stream(chunks, n_samples, model)
+
+        reservoir = Reservoir(n_samples, self.rng)
+        samples: list = []
+        targets: list = []
+        has_targets = False
+
+        for chunk_samples, chunk_targets in chunks:
+            has_targets = has_targets or bool(chunk_targets)
+            offset = reservoir.seen
+
+            for slot, position in reservoir.advance(len(chunk_samples)):
+                sample = chunk_samples[position - offset]
+                target = chunk_targets[position - offset] if chunk_targets else None
+
+                if slot < len(samples):
+                    samples[slot] = sample
+                    targets[slot] = target
+                else:
+                    samples.append(sample)
+                    targets.append(target)
+
+        return samples, targets if has_targets else None
@@ -1,23 +1,353 @@
 from __future__ import annotations
 
+import os
+import warnings
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Type
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator,
+                    List, Optional, Tuple, Type, Union)
 
+import numpy as np
+
+from caml.instrument import span
 from caml.model import EvalModel
 
+from .index import VectorIndex
+
+if TYPE_CHECKING:
+    from caml.score_store import ScoreTable
+
+    from .parallel import ParallelScorer
+
+# Models never see more of the pool than this at once unless a strategy sets its own batch size.
+DEFAULT_BATCH_SIZE = 1024
+
+
+def top_k(
+    scores: np.ndarray,
+    k: int,
+) -> np.ndarray:
+    scores = np.asarray(scores)
+
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k >= len(scores):
+        return np.argsort(-scores, kind='stable')
+
+    indices = np.argpartition(-scores, k - 1)[:k]
+    return indices[np.argsort(-scores[indices], kind='stable')]
+
 
 class Strategy(ABC):
     STRATEGIES: Dict[str, Type[Strategy]] = {}
 
+    def __init__(
+        self,
+        batch_size: int = None,
+        num_workers: int = 0,
+        model_conf: Union[Dict[str, Any], List[Dict[str, Any]]] = None,
+        start_method: str = None,
+        index: str = 'brute',
+        index_kwargs: Dict[str, Any] = None,
+        index_path: str = None,
+    ):
+        super(Strategy, self).__init__()
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.model_conf = model_conf
+        self.start_method = start_method
+        self.index = index
+        self.index_kwargs = index_kwargs if index_kwargs else {}
+        self.index_path = index_path
+        self._scorer: Optional[ParallelScorer] = None
+        self._score_table: Optional[ScoreTable] = None
+        self._sample_ids: Optional[Callable[[list], List[str]]] = None
+        self.index_key: Optional[str] = None
+        self.labelled: Optional[list] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state['_scorer'] = None
+        state['_score_table'] = None
+        state['_sample_ids'] = None
+        state['labelled'] = None
+        return state
+
     @abstractmethod
     def query(
         self,
         pool: list,
-        n_samples: int = None,
-        model: EvalModel = None,
-    ) -> List[int]:
+        n_samples: Optional[int] = None,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+        targets: Optional[list] = None,
+    ) -> Union[List[int], np.ndarray]:
         pass
 
+    def score(
+        self,
+        pool: list,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> np.ndarray:
+        raise NotImplementedError(f'{type(self).__name__} does not score samples.')
+
+    def iter_batches(
+        self,
+        pool: list,
+    ) -> Iterator[Tuple[int, list]]:
+        batch_size = self.batch_size if self.batch_size else DEFAULT_BATCH_SIZE
+
+        for start in range(0, len(pool), batch_size):
+            yield start, pool[start:start + batch_size]
+
+    def collect_batches(
+        self,
+        pool: list,
+        predict_batch: Callable[[list], Any],
+    ) -> np.ndarray:
+        outputs = None
+
+        for start, batch in self.iter_batches(pool):
+            batch_outputs = np.asarray(predict_batch(batch), dtype=np.float32)
+
+            if outputs is None:
+                outputs = np.empty((len(pool),) + batch_outputs.shape[1:], dtype=np.float32)
+
+            outputs[start:start + len(batch)] = batch_outputs
+
+        return outputs if outputs is not None else np.empty((0, 0), dtype=np.float32)
+
+    def predict_proba(
+        self,
+        pool: list,
+        model: EvalModel,
+    ) -> np.ndarray:
+        return self.collect_batches(pool, model.predict_proba)
+
+    def embed(
+        self,
+        pool: list,
+        model: EvalModel,
+    ) -> np.ndarray:
+        return self.collect_batches(pool, model.embed)
+
+    def grad_embed(
+        self,
+        pool: list,
+        model: EvalModel,
+    ) -> np.ndarray:
+        return self.collect_batches(pool, model.grad_embed)
+
+    def score_batches(
+        self,
+        pool: list,
+        score_batch: Callable[[list], np.ndarray],
+    ) -> np.ndarray:
+        scores = np.empty(len(pool), dtype=np.float32)
+
+        for start, batch in self.iter_batches(pool):
+            scores[start:start + len(batch)] = score_batch(batch)
+
+        return scores
+
+    @property
+    def indexed(self) -> bool:
+        return False
+
+    def use_index(
+        self,
+        key: Optional[str],
+        labelled: Optional[list] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        self.index_key = key
+        self.labelled = labelled
+
+        if path is not None:
+            self.index_path = path
+
+    def load_index(
+        self,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> VectorIndex:
+        stale = False
+
+        if self.index_path is not None and os.path.exists(self.index_path):
+            if VectorIndex.saved_key(self.index_path) == self.index_key:
+                return VectorIndex.load(self.index_path)
+
+            stale = True
+
+        index = VectorIndex.get(self.index, **self.index_kwargs)
+
+        # Distances between embeddings of different models are meaningless, so an index saved under another model
+        # is rebuilt from the labelled samples with the current one.
+        if self.labelled is not None and len(self.labelled) and model is not None and not isinstance(model, list):
+            index.add(self.embed(self.labelled, model))
+        elif stale:
+            warnings.warn(
+                f'The index at {self.index_path} was built with another model and no labelled samples are available '
+                'to rebuild it, starting from an empty index.'
+            )
+
+        return index
+
+    def update_index(
+        self,
+        index: VectorIndex,
+        embeddings: np.ndarray,
+    ) -> None:
+        if self.index_path:
+            index.add(embeddings)
+            index.save(self.index_path, key=self.index_key)
+
+    @property
+    def scorable(self) -> bool:
+        return type(self).score is not Strategy.score
+
+    def use_score_table(
+        self,
+        table: ScoreTable,
+        sample_ids: Callable[[list], List[str]],
+    ) -> None:
+        if self.scorable:
+            self._score_table = table
+            self._sample_ids = sample_ids
+
+    def parallel_scorer(self) -> Optional[ParallelScorer]:
+        if self.num_workers > 1 and self.model_conf:
+            if self._scorer is None:
+                from .parallel import ParallelScorer
+
+                self._scorer = ParallelScorer(
+                    self.model_conf,
+                    self.num_workers,
+                    start_method=self.start_method,
+                )
+
+            return self._scorer
+
+        return None
+
+    def compute_scores(
+        self,
+        pool: list,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> np.ndarray:
+        scorer = self.parallel_scorer()
+
+        if scorer is not None:
+            return scorer.score(self, pool)
+
+        return np.asarray(self.score(pool, model), dtype=np.float64)
+
+    def cached_score(
+        self,
+        pool: list,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> np.ndarray:
+        if self._score_table is None or self._sample_ids is None:
+            return self.compute_scores(pool, model)
+
+        # Only samples without a stored score for this model and strategy are run through the model.
+        return self._score_table.get(
+            self._sample_ids(pool),
+            pool,
+            lambda missing: self.compute_scores(missing, model),
+        )
+
+    def n_candidates(
+        self,
+        n_samples: int,
+    ) -> int:
+        return n_samples
+
+    def select_candidates(
+        self,
+        candidates: list,
+        n_samples: int,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> np.ndarray:
+        # Candidates arrive best first, from either the in-memory or the streaming query path.
+        return np.arange(min(n_samples, len(candidates)))
+
+    def score_top_k(
+        self,
+        pool: list,
+        k: int,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        with span('strategy_scoring'):
+            scorer = self.parallel_scorer()
+
+            # Workers reduce to their shard's top k, which is cheaper than gathering every score when none are stored.
+            if scorer is not None and self._score_table is None:
+                return scorer.top_k(self, pool, k)
+
+            scores = self.cached_score(pool, model)
+            indices = top_k(scores, k)
+            return indices, scores[indices]
+
+    def close(self) -> None:
+        if self._score_table is not None:
+            self._score_table.flush()
+            self._score_table = None
+            self._sample_ids = None
+
+        if self._scorer is not None:
+            self._scorer.close()
+            self._scorer = None
+
+    def query_stream(
+        self,
+        chunks: Iterable[Tuple[list, Optional[list]]],
+        n_samples: Optional[int] = None,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> Tuple[list, Optional[list]]:
+        if not self.scorable or n_samples is None:
+            return self._query_materialized(chunks, n_samples, model)
+
+        n_candidates = self.n_candidates(n_samples)
+        best_scores = np.empty(0, dtype=np.float64)
+        best_samples: list = []
+        best_targets: list = []
+        has_targets = False
+
+        for samples, targets in chunks:
+            has_targets = has_targets or bool(targets)
+            indices, scores = self.score_top_k(samples, n_candidates, model)
+
+            candidate_scores = np.concatenate([best_scores, scores])
+            candidate_samples = best_samples + [samples[i] for i in indices]
+            candidate_targets = best_targets + [targets[i] if targets else None for i in indices]
+
+            keep = top_k(candidate_scores, n_candidates)
+            best_scores = candidate_scores[keep]
+            best_samples = [candidate_samples[i] for i in keep]
+            best_targets = [candidate_targets[i] for i in keep]
+
+        kept = self.select_candidates(best_samples, n_samples, model)
+        return [best_samples[i] for i in kept], [best_targets[i] for i in kept] if has_targets else None
+
+    def _query_materialized(
+        self,
+        chunks: Iterable[Tuple[list, Optional[list]]],
+        n_samples: Optional[int] = None,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+    ) -> Tuple[list, Optional[list]]:
+        pool: list = []
+        pool_targets: list = []
+
+        for samples, targets in chunks:
+            pool.extend(samples)
+
+            if targets:
+                pool_targets.extend(targets)
+
+        indices = self.query(pool, n_samples, model, pool_targets if pool_targets else None)
+        samples = [pool[i] for i in indices]
+        targets = [pool_targets[i] for i in indices] if pool_targets else None
+        return samples, targets
+
     @staticmethod
     def get(
         strategy: str,
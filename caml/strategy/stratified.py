@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Union
+
+import numpy as np
+
+from caml.model import EvalModel
+
+from .strategy import Strategy, register_strategy
+
+if TYPE_CHECKING:
+    from caml.score_store import ScoreTable
+
+ALLOCATIONS = ('balanced', 'proportional')
+
+
+def balanced_quotas(
+    counts: np.ndarray,
+    n_samples: int,
+) -> np.ndarray:
+    if n_samples >= counts.sum():
+        return counts.copy()
+
+    # Water-filling: raise a common per-class level until `n_samples` items are covered.
+    order = np.argsort(counts, kind='stable')
+    sorted_counts = counts[order]
+    n_classes = len(counts)
+    filled = np.concatenate([[0], np.cumsum(sorted_counts)[:-1]])
+    capacity = filled + sorted_counts * (n_classes - np.arange(n_classes))
+    first_open = int(np.searchsorted(capacity, n_samples))
+
+    level, extra = divmod(n_samples - int(filled[first_open]), n_classes - first_open)
+    sorted_quotas = np.minimum(sorted_counts, level)
+    sorted_quotas[first_open:first_open + extra] += 1
+
+    quotas = np.empty_like(counts)
+    quotas[order] = sorted_quotas
+    return quotas
+
+
+def proportional_quotas(
+    counts: np.ndarray,
+    n_samples: int,
+) -> np.ndarray:
+    if n_samples >= counts.sum():
+        return counts.copy()
+
+    exact = counts * (n_samples / counts.sum())
+    quotas = np.floor(exact).astype(counts.dtype)
+    # Largest remainders take the seats left over by flooring.
+    extra = n_samples - int(quotas.sum())
+    quotas[np.argsort(quotas - exact, kind='stable')[:extra]] += 1
+    return quotas
+
+
+@register_strategy(name='stratified')
+class Stratified(Strategy):
+    def __init__(
+        self,
+        base: str = None,
+        base_kwargs: Dict[str, Any] = None,
+        allocation: str = 'balanced',
+        seed: int = None,
+        **kwargs: Any,
+    ):
+        super(Stratified, self).__init__(**kwargs)
+
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f'Unsupported allocation {allocation}. Please use one of {ALLOCATIONS}.')
+
+        self.base = Strategy.get(base, **{**kwargs, **(base_kwargs if base_kwargs else {})}) if base else None
+        self.allocation = allocation
+        self.rng = np.random.default_rng(seed)
+
+        if self.base is not None and not self.base.scorable:
+            raise ValueError(f'`{base}` does not score samples and cannot be stratified.')
+
+    def query(
+        self,
+        pool: list,
+        n_samples: int = None,
+        model: Union[EvalModel, List[EvalModel]] = None,
+        targets: list = None,
+    ) -> np.ndarray:
+        _n_samples = len(pool) if n_samples is None else n_samples
+        labels = targets if targets else self.predict_labels(pool, model)
+        _, codes = np.unique(np.asarray(labels), return_inverse=True)
+        codes = codes.ravel()
+        counts = np.bincount(codes)
+
+        if self.allocation == 'balanced':
+            quotas = balanced_quotas(counts, _n_samples)
+        else:
+            quotas = proportional_quotas(counts, _n_samples)
+
+        if self.base is not None:
+            scores = self.base.cached_score(pool, model)
+        else:
+            scores = self.rng.random(len(pool))
+
+        # One sort groups samples by class with the best scores first, then ranks within each class.
+        order = np.lexsort((-scores, codes))
+        sorted_codes = codes[order]
+        class_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        ranks = np.arange(len(order)) - class_starts[sorted_codes]
+        return order[ranks < quotas[sorted_codes]]
+
+    def use_score_table(
+        self,
+        table: ScoreTable,
+        sample_ids: Callable[[list], List[str]],
+    ) -> None:
+        if self.base is not None:
+            self.base.use_score_table(table, sample_ids)
+
+    def predict_labels(
+        self,
+        pool: list,
+        model: Union[EvalModel, List[EvalModel]] = None,
+    ) -> np.ndarray:
+        if model is None or isinstance(model, list):
+            raise ValueError(f'{type(self).__name__} requires targets or a single model to predict them.')
+
+        predictions = [np.asarray(model.predict(batch)) for _, batch in self.iter_batches(pool)]
+        return np.concatenate(predictions) if predictions else np.empty(0, dtype=np.int64)
+
+    def close(self) -> None:
+        super(Stratified, self).close()
+
+        if self.base is not None:
+            self.base.close()
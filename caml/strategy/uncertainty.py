@@ -0,0 +1,160 @@
+import warnings
+from abc import ABC, abstractmethod
+from typing import Any, List
+
+import numpy as np
+
+from caml.model import EvalModel
+
+from .index import suppress_duplicates
+from .strategy import Strategy, register_strategy
+
+EPS = 1e-12
+
+
+class Uncertainty(Strategy, ABC):
+    def __init__(
+        self,
+        dedup_radius: float = None,
+        dedup_oversample: int = 4,
+        **kwargs: Any,
+    ):
+        super(Uncertainty, self).__init__(**kwargs)
+        self.dedup_radius = dedup_radius
+        self.dedup_oversample = dedup_oversample
+
+    def query(
+        self,
+        pool: list,
+        n_samples: int = None,
+        model: EvalModel = None,
+        targets: list = None,
+    ) -> List[int]:
+        _n_samples = len(pool) if n_samples is None else n_samples
+        candidates, _ = self.score_top_k(pool, self.n_candidates(_n_samples), model)
+
+        if self.dedup_radius is None:
+            return candidates.tolist()
+
+        kept = self.select_candidates([pool[i] for i in candidates], _n_samples, model)
+        return candidates[kept].tolist()
+
+    @property
+    def indexed(self) -> bool:
+        return self.dedup_radius is not None
+
+    def n_candidates(
+        self,
+        n_samples: int,
+    ) -> int:
+        return n_samples if self.dedup_radius is None else n_samples * self.dedup_oversample
+
+    def select_candidates(
+        self,
+        candidates: list,
+        n_samples: int,
+        model: EvalModel = None,
+    ) -> np.ndarray:
+        if self.dedup_radius is None:
+            return super(Uncertainty, self).select_candidates(candidates, n_samples, model)
+
+        if model is None:
+            raise ValueError(f'{type(self).__name__} requires a model.')
+
+        embeddings = self.embed(candidates, model)
+        index = self.load_index(model)
+        kept = suppress_duplicates(embeddings, n_samples, self.dedup_radius, index)
+
+        if len(kept) < n_samples:
+            warnings.warn(
+                f'Only {len(kept)} of {n_samples} candidates are not near-duplicates, '
+                'filling up with the highest scoring duplicates.'
+            )
+            rest = np.setdiff1d(np.arange(len(candidates)), kept, assume_unique=True)
+            kept = np.concatenate([kept, rest[:n_samples - len(kept)]])
+
+        self.update_index(index, embeddings[kept])
+        return kept
+
+    def score(
+        self,
+        pool: list,
+        model: EvalModel = None,
+    ) -> np.ndarray:
+        if model is None:
+            raise ValueError(f'{type(self).__name__} requires a model.')
+
+        return self.score_batches(
+            pool,
+            lambda batch: self.score_proba(np.asarray(model.predict_proba(batch), dtype=np.float32)),
+        )
+
+    @abstractmethod
+    def score_proba(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        pass
+
+
+@register_strategy(name='least_confidence')
+class LeastConfidence(Uncertainty):
+    def score_proba(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        return 1.0 - proba.max(axis=1)
+
+
+@register_strategy(name='margin')
+class Margin(Uncertainty):
+    def score_proba(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        top2 = np.partition(proba, -2, axis=1)[:, -2:]
+        return top2[:, 0] - top2[:, 1]
+
+
+@register_strategy(name='entropy')
+class Entropy(Uncertainty):
+    def score_proba(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        return -(proba * np.log(np.maximum(proba, EPS))).sum(axis=1)
+
+
+@register_strategy(name='bald')
+class BALD(Uncertainty):
+    def __init__(
+        self,
+        n_passes: int = 10,
+        **kwargs: Any,
+    ):
+        super(BALD, self).__init__(**kwargs)
+        self.n_passes = n_passes
+
+    def score(
+        self,
+        pool: list,
+        model: EvalModel = None,
+    ) -> np.ndarray:
+        if model is None:
+            raise ValueError(f'{type(self).__name__} requires a model.')
+
+        return self.score_batches(
+            pool,
+            lambda batch: self.score_proba(
+                np.asarray(model.predict_proba_samples(batch, self.n_passes), dtype=np.float32),
+            ),
+        )
+
+    def score_proba(
+        self,
+        proba: np.ndarray,
+    ) -> np.ndarray:
+        # Mutual information between predictions and weights: H(E[p]) - E[H(p)] over the stochastic passes.
+        mean_entropy = -(proba * np.log(np.maximum(proba, EPS))).sum(axis=2).mean(axis=1)
+        mean = proba.mean(axis=1)
+        return -(mean * np.log(np.maximum(mean, EPS))).sum(axis=1) - mean_entropy
@@ -1,10 +1,19 @@
+import shutil
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
 
 from caml.config import Config
 from caml.dataset import Dataset
+from caml.instrument import span
+from caml.materialize import Linker
+from caml.metrics import Metric
 from caml.model import EvalModel, Model, TrainModel
 from caml.task.task import Task
+from caml.upload import UploadManager
 
 
 class DLTask(Task, ABC):
@@ -12,16 +21,18 @@ class DLTask(Task, ABC):
         self,
         model_conf: Dict[str, Any],
         dataset_conf: Dict[str, Any],
+        **kwargs: Any,
     ) -> None:
         model = Config(model_conf).eval()
         dataset = Config(dataset_conf).eval()
-        self.process(model, dataset)
+        self.process(model, dataset, **kwargs)
 
     @abstractmethod
     def process(
         self,
         model: Model,
         dataset: Dataset,
+        **kwargs: Any,
     ) -> None:
         pass
 
@@ -31,22 +42,54 @@ class TrainTask(DLTask):
         self,
         model: TrainModel,
         dataset: Dataset,
+        upload_retries: int = 3,
+        **kwargs: Any,
     ) -> None:
         dataset.load()
         model.load()
         X = dataset.X()
         y = dataset.y()
-        model.fit(X, y)
-        best_model = model.best_model()
+        checkpoints: List[str] = []
+
+        # Checkpoints are uploaded in order on a background thread while training continues.
+        with UploadManager(retries=upload_retries) as uploads:
+            def upload_checkpoint(path: str) -> None:
+                checkpoints.append(path)
+                uploads.submit(self.upload_snapshot, self.snapshot(path))
+
+            model.on_checkpoint = upload_checkpoint
+
+            with span('fit'):
+                model.fit(X, y)
+            best_model = model.best_model()
+
+            if best_model and (not checkpoints or checkpoints[-1] != best_model):
+                uploads.submit(self.upload_snapshot, self.snapshot(best_model))
 
-        if best_model:
-            self.upload_model(best_model)
+    def snapshot(
+        self,
+        path: str,
+    ) -> str:
+        # Training may delete or overwrite a checkpoint before its upload starts, so the upload reads a link to it.
+        snapshot = Path(tempfile.mkdtemp()).joinpath(Path(path).name)
+        Linker()(Path(path), snapshot)
+        return str(snapshot)
+
+    def upload_snapshot(
+        self,
+        path: str,
+    ) -> None:
+        try:
+            with span('upload'):
+                self.upload_model(path)
+        finally:
+            shutil.rmtree(Path(path).parent, ignore_errors=True)
 
     def upload_model(
         self,
         path: str,
     ) -> None:
-        self._task.update_output_model(
+        self.backend.upload_model(
             path,
         )
 
@@ -56,23 +99,53 @@ class EvalTask(DLTask):
         self,
         model: EvalModel,
         dataset: Dataset,
+        metrics: List[str] = None,
+        batch_size: int = 1024,
+        report_every: int = None,
+        **kwargs: Any,
     ) -> None:
         dataset.load()
         model.load()
         X = dataset.X()
         y = dataset.y()
-        pred = model.predict(X)
-        score_name, score_value = model.eval(pred, y)
-        self.upload_score(score_name, score_value)
+
+        if not metrics:
+            with span('predict'):
+                pred = model.predict(X)
+
+            score_name, score_value = model.eval(pred, y)
+            self.upload_score(score_name, score_value)
+            return
+
+        # Predictions are consumed batch by batch, so memory does not grow with the size of the test set.
+        accumulators = [Metric.get(metric) for metric in metrics]
+
+        with span('predict'):
+            for i, (start, proba) in enumerate(model.predict_batches(X, batch_size)):
+                y_batch = np.asarray(y[start:start + len(proba)], dtype=np.int64)
+
+                for accumulator in accumulators:
+                    accumulator.update(proba, y_batch)
+
+                if report_every and (i + 1) % report_every == 0:
+                    for accumulator in accumulators:
+                        for name, value in accumulator.compute().items():
+                            self.upload_score(name, value, title='Evaluation (running)', iteration=start + len(proba))
+
+        for accumulator in accumulators:
+            for name, value in accumulator.compute().items():
+                self.upload_score(name, value)
 
     def upload_score(
         self,
         name: str,
         value: float,
+        title: str = 'Evaluation',
+        iteration: int = 1,
     ) -> None:
-        self._task.get_logger().report_scalar(
-            title='Evaluation',
+        self.backend.report_scalar(
+            title=title,
             series=name,
             value=value,
-            iteration=1,
+            iteration=iteration,
         )
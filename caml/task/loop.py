@@ -0,0 +1,186 @@
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from caml.config import Config
+from caml.data_source import DataSource
+from caml.dataset import Dataset
+from caml.instrument import span
+from caml.lineage import check_sample_ids, labelled_ids
+from caml.model import EvalModel, TrainModel
+from caml.strategy.strategy import Strategy
+from caml.task.query import DataQueryTask
+
+
+class ActiveLearningTask(DataQueryTask):
+    def __init__(
+        self,
+        **kwargs: Any,
+    ):
+        task_init = kwargs.pop('task_init', {})
+        task_init['task_type'] = 'training'
+        super(ActiveLearningTask, self).__init__(
+            task_init=task_init,
+            **kwargs,
+        )
+
+    def execute(
+        self,
+        strategy: str,
+        data_source_conf: Dict[str, Any],
+        train_model_conf: Dict[str, Any],
+        eval_model_conf: Dict[str, Any],
+        eval_dataset_conf: Dict[str, Any],
+        n_rounds: int,
+        n_samples: int,
+        strategy_kwargs: Dict[str, Any] = None,
+        seed: int = None,
+        parent_dataset: str = None,
+        upload: bool = False,
+        chunk_size: int = None,
+    ) -> None:
+        data_source: DataSource = Config(data_source_conf).eval()
+        train_model: TrainModel = Config(train_model_conf).eval()
+        eval_model: EvalModel = Config(eval_model_conf).eval()
+        eval_dataset: Dataset = Config(eval_dataset_conf).eval()
+        train_model.load()
+        eval_model.load()
+        eval_dataset.load()
+        X_eval, y_eval = eval_dataset.X(), eval_dataset.y()
+
+        # The pool is loaded once and every round works on index arrays into it.
+        samples, targets = data_source.samples()
+
+        if targets is None:
+            raise ValueError('The active learning loop needs a data source with targets to label its selections.')
+
+        if parent_dataset is not None:
+            check_sample_ids(data_source)
+
+        exclude = labelled_ids(parent_dataset)
+        labelled = np.zeros(len(samples), dtype=bool)
+
+        if exclude:
+            labelled[[i for i, id_ in enumerate(data_source.sample_ids(samples)) if id_ in exclude]] = True
+
+        # Strategies that score with a model are not usable before the first fit, so round 0 samples at random.
+        warmup = Strategy.get('random', seed=seed)
+        _strategy = Strategy.get(strategy, **(strategy_kwargs if strategy_kwargs else {}))
+        trained = bool(labelled.any())
+
+        try:
+            for round_ in range(n_rounds):
+                round_start = time.perf_counter()
+
+                with span('selection'):
+                    selected = self.query_round(
+                        _strategy if trained else warmup,
+                        samples,
+                        targets,
+                        labelled,
+                        n_samples,
+                        eval_model if trained else None,
+                    )
+
+                labelled[selected] = True
+                query_end = time.perf_counter()
+
+                if upload:
+                    parent_dataset = self.upload_selection(
+                        data_source,
+                        self.take(samples, selected),
+                        [targets[i] for i in selected],
+                        chunk_size,
+                        parent_dataset,
+                    )
+
+                upload_end = time.perf_counter()
+                indices = np.flatnonzero(labelled)
+
+                with span('fit'):
+                    train_model.fit(self.take(samples, indices), [targets[i] for i in indices])
+
+                self.warm_start(train_model, eval_model)
+                trained = True
+                train_end = time.perf_counter()
+
+                with span('predict'):
+                    pred = eval_model.predict(X_eval)
+
+                score_name, score_value = eval_model.eval(pred, y_eval)
+                eval_end = time.perf_counter()
+
+                self.report_round(
+                    round_,
+                    n_labelled=len(indices),
+                    score_name=score_name,
+                    score_value=score_value,
+                    timings={
+                        'query': query_end - round_start,
+                        'upload': upload_end - query_end,
+                        'train': train_end - upload_end,
+                        'eval': eval_end - train_end,
+                        'round': eval_end - round_start,
+                    },
+                )
+        finally:
+            _strategy.close()
+
+        best_model = train_model.best_model()
+
+        if best_model:
+            self.backend.upload_model(best_model)
+
+    def take(
+        self,
+        samples: list,
+        indices: np.ndarray,
+    ) -> list:
+        return samples[indices] if isinstance(samples, np.ndarray) else [samples[i] for i in indices]
+
+    def query_round(
+        self,
+        strategy: Strategy,
+        samples: list,
+        targets: list,
+        labelled: np.ndarray,
+        n_samples: int,
+        model: Optional[EvalModel],
+    ) -> np.ndarray:
+        pool_indices = np.flatnonzero(~labelled)
+        pool = self.take(samples, pool_indices)
+
+        if strategy.indexed:
+            # The model changes every round, so the index is rebuilt from the labelled samples with the current one.
+            strategy.use_index(uuid.uuid4().hex, labelled=self.take(samples, np.flatnonzero(labelled)))
+        indices = strategy.query(pool, min(n_samples, len(pool)), model, [targets[i] for i in pool_indices])
+        return pool_indices[np.asarray(indices, dtype=np.int64)]
+
+    def warm_start(
+        self,
+        train_model: TrainModel,
+        eval_model: EvalModel,
+    ) -> None:
+        try:
+            eval_model.load_state(train_model.state())
+        except NotImplementedError:
+            best_model = train_model.best_model()
+
+            if best_model:
+                eval_model.load_model(best_model)
+
+    def report_round(
+        self,
+        round_: int,
+        n_labelled: int,
+        score_name: str,
+        score_value: float,
+        timings: Dict[str, float],
+    ) -> None:
+        self.backend.report_scalar(title='Active learning', series=score_name, value=score_value, iteration=round_)
+        self.backend.report_scalar(title='Labelled samples', series='count', value=n_labelled, iteration=round_)
+
+        for series, seconds in timings.items():
+            self.backend.report_scalar(title='Round time (s)', series=series, value=seconds, iteration=round_)
@@ -1,11 +1,25 @@
-from typing import Any, Dict
+import os
+import shutil
+import tempfile
+import uuid
+import warnings
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from clearml import Dataset as _Dataset
-from clearml import TaskTypes
+import numpy as np
 
+from caml.backend import DatasetWriter
+from caml.cache import get_dataset
 from caml.config import Config
+from caml.data_source import DataSource, has_own_sample_ids
+from caml.instrument import span
+from caml.lineage import (INDEX_FILE, check_sample_ids, labelled_ids,
+                          write_lineage)
+from caml.model import EvalModel
+from caml.score_store import (get_score_store, model_fingerprint,
+                              strategy_fingerprint)
 from caml.strategy.strategy import Strategy
 from caml.task.task import Task
+from caml.upload import UploadManager
 
 
 class DataQueryTask(Task):
@@ -14,7 +28,7 @@ class DataQueryTask(Task):
         **kwargs: Any,
     ):
         task_init = kwargs.pop('task_init', {})
-        task_init['task_type'] = TaskTypes.data_processing
+        task_init.setdefault('task_type', 'data_processing')
         super(DataQueryTask, self).__init__(
             task_init=task_init,
             **kwargs,
@@ -24,27 +38,210 @@ class DataQueryTask(Task):
         self,
         strategy: str,
         data_source_conf: Dict[str, Any],
-        model_conf: Dict[str, Any] = None,
+        model_conf: Union[Dict[str, Any], List[Dict[str, Any]]] = None,
         strategy_kwargs: Dict[str, Any] = None,
         n_samples: int = None,
+        chunk_size: int = None,
+        parent_dataset: str = None,
+        upload_retries: int = 3,
     ) -> None:
         data_source = Config(data_source_conf).eval()
-        model = Config(model_conf).eval() if model_conf else None
+        if isinstance(model_conf, list):
+            model: Union[EvalModel, List[EvalModel], None] = [self.load_model(conf) for conf in model_conf]
+        else:
+            model = self.load_model(model_conf) if model_conf else None
 
         _strategy_kwargs = {} if strategy_kwargs is None else strategy_kwargs
         _strategy = Strategy.get(strategy, **_strategy_kwargs)
+        # Set after construction so strategies with their own constructor need not accept it; parallel scoring
+        # workers load the model from it.
+        _strategy.model_conf = model_conf
+        store = get_score_store()
+
+        if store is not None and model_conf and model is not None:
+            # Stored scores are looked up by sample id, so only sources that define stable ids can use them.
+            if not has_own_sample_ids(data_source):
+                warnings.warn(
+                    f'{type(data_source).__name__} does not define its own sample ids, so its scores are not stored.'
+                )
+            else:
+                model_key = model_fingerprint(model_conf, model)
+
+                if model_key is not None:
+                    table = store.open(model_key, strategy_fingerprint(strategy, _strategy_kwargs))
+                    _strategy.use_score_table(table, data_source.sample_ids)
+
+        if parent_dataset is not None:
+            check_sample_ids(data_source)
+
+        lineage_dir = tempfile.mkdtemp()
+        # Filled with the pool's already labelled samples during selection, which an index may be rebuilt from.
+        labelled: list = []
+
+        configured_index = None
+
+        if _strategy.indexed:
+            configured_index = self.use_dataset_index(
+                _strategy,
+                model_conf,
+                model,
+                parent_dataset,
+                lineage_dir,
+                labelled,
+            )
+
+        try:
+            with span('selection'):
+                samples, targets = self.select(
+                    _strategy,
+                    data_source,
+                    model,
+                    n_samples,
+                    chunk_size,
+                    labelled_ids(parent_dataset),
+                    labelled,
+                )
+        finally:
+            _strategy.close()
+
+        # A configured index path keeps receiving the latest index alongside the copy stored with the dataset.
+        if configured_index and _strategy.index_path and os.path.exists(_strategy.index_path):
+            shutil.copyfile(_strategy.index_path, configured_index)
+
+        self.upload_selection(
+            data_source,
+            samples,
+            targets,
+            chunk_size,
+            parent_dataset,
+            upload_retries,
+            lineage_dir,
+        )
+
+    def use_dataset_index(
+        self,
+        strategy: Strategy,
+        model_conf: Union[Dict[str, Any], List[Dict[str, Any]], None],
+        model: Union[EvalModel, List[EvalModel], None],
+        parent_dataset: Optional[str],
+        lineage_dir: str,
+        labelled: list,
+    ) -> Optional[str]:
+        configured_index = strategy.index_path
+        index_path = os.path.join(lineage_dir, INDEX_FILE)
+
+        # The index lives with the round's dataset; it starts from a configured index or from the parent round's.
+        if configured_index and os.path.exists(configured_index):
+            shutil.copyfile(configured_index, index_path)
+        elif parent_dataset is not None:
+            parent_index = os.path.join(get_dataset(parent_dataset), INDEX_FILE)
+
+            if os.path.exists(parent_index):
+                shutil.copyfile(parent_index, index_path)
+
+        model_key = model_fingerprint(model_conf, model) if model_conf and model is not None else None
+        # Models without weights on disk cannot be recognized again, so their index is always rebuilt.
+        strategy.use_index(model_key if model_key else uuid.uuid4().hex, labelled=labelled, path=index_path)
+        return configured_index
+
+    def upload_selection(
+        self,
+        data_source: DataSource,
+        samples: list,
+        targets: Optional[list] = None,
+        chunk_size: Optional[int] = None,
+        parent_dataset: Optional[str] = None,
+        upload_retries: int = 3,
+        lineage_dir: Optional[str] = None,
+    ) -> str:
+        dataset = self.backend.create_dataset()
+        step = chunk_size if chunk_size else max(len(samples), 1)
+
+        # Each chunk uploads in the background while the next one is materialized; the writer sees calls in order.
+        with UploadManager(retries=upload_retries) as uploads:
+            # Only this round's selection is uploaded; earlier rounds are reached through the parent link.
+            lineage_path = write_lineage(data_source.sample_ids(samples), parent=parent_dataset, path=lineage_dir)
+            uploads.submit(self.upload_chunk, dataset, lineage_path)
+
+            for start in range(0, max(len(samples), 1), step):
+                end = start + step
+
+                with span('materialization'):
+                    data_path = data_source.create_dataset(samples[start:end], targets[start:end] if targets else None)
+
+                uploads.submit(self.upload_chunk, dataset, data_path)
+
+        return dataset.finalize()
+
+    def upload_chunk(
+        self,
+        dataset: DatasetWriter,
+        path: str,
+    ) -> None:
+        with span('upload'):
+            dataset.add_files(path=path)
+            dataset.upload()
+
+        # Chunks are written to fresh directories by create_dataset; once uploaded they are only taking up disk.
+        # A failed upload leaves its chunk in place for the retry.
+        shutil.rmtree(path, ignore_errors=True)
+
+    def load_model(
+        self,
+        model_conf: Dict[str, Any],
+    ) -> EvalModel:
+        model = Config(model_conf).eval()
+        model.load()
+        return model
+
+    def select(
+        self,
+        strategy: Strategy,
+        data_source: DataSource,
+        model: Optional[Union[EvalModel, List[EvalModel]]] = None,
+        n_samples: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        exclude: Optional[Set[str]] = None,
+        labelled: Optional[list] = None,
+    ) -> Tuple[list, Optional[list]]:
+        if chunk_size:
+            chunks = data_source.iter_samples(chunk_size)
+
+            if exclude:
+                chunks = (self.unlabelled(data_source, *chunk, exclude, labelled) for chunk in chunks)
+
+            return strategy.query_stream(chunks, n_samples, model)
 
         samples, targets = data_source.samples()
-        indices = _strategy.query(samples, n_samples, model)
-        samples = [samples[i] for i in indices]
+
+        if exclude:
+            samples, targets = self.unlabelled(data_source, samples, targets, exclude, labelled)
+
+        indices = strategy.query(samples, n_samples, model, targets)
+        # Array pools, such as packed shards, are gathered with one fancy index instead of per-item lookups.
+        samples = samples[indices] if isinstance(samples, np.ndarray) else [samples[i] for i in indices]
 
         if targets:
             targets = [targets[i] for i in indices]
 
-        data_path = data_source.create_dataset(samples, targets)
-        dataset = _Dataset.create(
-            use_current_task=True,
-        )
-        dataset.add_files(path=data_path)
-        dataset.upload()
-        dataset.finalize()
+        return samples, targets
+
+    def unlabelled(
+        self,
+        data_source: DataSource,
+        samples: list,
+        targets: Optional[list],
+        exclude: Set[str],
+        labelled: Optional[list] = None,
+    ) -> Tuple[list, Optional[list]]:
+        is_labelled = [id_ in exclude for id_ in data_source.sample_ids(samples)]
+        keep = [i for i, flag in enumerate(is_labelled) if not flag]
+
+        if labelled is not None:
+            labelled.extend(sample for sample, flag in zip(samples, is_labelled) if flag)
+
+        if len(keep) == len(samples):
+            return samples, targets
+
+        samples = samples[keep] if isinstance(samples, np.ndarray) else [samples[i] for i in keep]
+        return samples, [targets[i] for i in keep] if targets else None
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List
 
-from clearml import Task as _Task
+from caml.backend import Backend, get_backend, set_backend
+from caml.instrument import Recorder, set_recorder
 
 EXECUTION_PARAMS = 'Execution'
 
@@ -9,6 +10,7 @@ EXECUTION_PARAMS = 'Execution'
 class Task(ABC):
     _requirements = [
         ('clearml', ''),
+        ('numpy', ''),
         ('yacs', ''),
         ('git+https://github.com/tronglh241/caml.git', '')
     ]
@@ -26,6 +28,9 @@ class Task(ABC):
         ignored_requirements: List[str] = None,
         remote: bool = False,
         queue_name: str = 'default',
+        backend: str = None,
+        backend_kwargs: Dict[str, Any] = None,
+        trace_memory: bool = False,
     ):
         super(Task, self).__init__()
         self.project_name = project_name
@@ -36,39 +41,42 @@ class Task(ABC):
         self.ignored_requirements = ignored_requirements
         self.remote = remote
         self.queue_name = queue_name
+        self.trace_memory = trace_memory
+
+        if backend is not None:
+            set_backend(Backend.get(backend, **(backend_kwargs if backend_kwargs else {})))
 
     @property
-    def _task(self):
-        return _Task.current_task()
+    def backend(self) -> Backend:
+        return get_backend()
 
     def run(self) -> None:
-        for requirement in Task._requirements:
-            _Task.add_requirements(*requirement)
-
-        if self.requirement_file:
-            _Task.add_requirements(self.requirement_file)
-
-        if self.ignored_requirements:
-            for ignored_requirement in self.ignored_requirements:
-                _Task.ignore_requirements(ignored_requirement)
-
-        _Task.init(
+        self.backend.init_task(
             project_name=self.project_name,
             task_name=self.task_name,
-            **{**Task._task_init, **self.task_init},
+            task_init={**Task._task_init, **self.task_init},
+            requirements=Task._requirements,
+            requirement_file=self.requirement_file,
+            ignored_requirements=self.ignored_requirements,
         )
 
         if self.execution:
-            self._task.connect(
+            self.backend.connect(
                 self.execution,
                 name=EXECUTION_PARAMS,
             )
 
         if self.remote:
-            self._task.execute_remotely(self.queue_name)
+            self.backend.execute_remotely(self.queue_name)
+
+        recorder = Recorder(trace_memory=self.trace_memory)
+        set_recorder(recorder)
 
-        self._task.output_uri = self._task_init['output_uri']
-        self.execute(**self.execution)
+        try:
+            self.execute(**self.execution)
+        finally:
+            set_recorder(None)
+            recorder.report(self.backend)
 
     @abstractmethod
     def execute(self, **kwargs: Any) -> None:
@@ -0,0 +1,24 @@
+project_name: Unnamed project
+task_name: Unnamed task
+remote: False
+queue_name: default
+execution:
+  strategy: ...
+  n_rounds: ...
+  n_samples: ...
+  data_source_conf:
+    module: data_source
+    name: UnnamedDataSource
+    kwargs:
+      key: ...
+  train_model_conf:
+    module: model
+    name: UnnamedTrainModel
+  eval_model_conf:
+    module: model
+    name: UnnamedEvalModel
+  eval_dataset_conf:
+    module: dataset
+    name: UnnamedDataset
+    kwargs:
+      id_: ...
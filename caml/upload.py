@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+import time
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, List
+
+
+class UploadManager:
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_pending: int = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        super(UploadManager, self).__init__()
+        self.retries = retries
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='caml-upload')
+        # Producers block once this many uploads are queued or running, which bounds the disk held by pending files.
+        self.slots = threading.BoundedSemaphore(max_pending if max_pending else 2 * max_workers)
+        self.futures: List[Future] = []
+
+    def __enter__(self) -> UploadManager:
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not mask the original error with an upload failure.
+            wait(self.futures)
+            self.executor.shutdown()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Future:
+        self.slots.acquire()
+
+        try:
+            future = self.executor.submit(self._run, fn, *args, **kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self.slots.release())
+        self.futures.append(future)
+        return future
+
+    def _run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        for attempt in range(self.retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+
+                delay = self.backoff * 2 ** attempt
+                warnings.warn(f'Upload failed with {e!r}, retrying in {delay:.1f}s.')
+                time.sleep(delay)
+
+    def join(self) -> List[Any]:
+        futures, self.futures = self.futures, []
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def close(self) -> List[Any]:
+        try:
+            return self.join()
+        finally:
+            self.executor.shutdown()
@@ -1,11 +1,12 @@
-import shutil
 import tempfile
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 from torchvision.datasets import MNIST
 
 from caml.data_source import DataSource
+from caml.materialize import materialize
+from caml.packed import META_FILE, PackedDataSource, write_packed
 
 
 class MNISTSource(DataSource):
@@ -27,30 +28,70 @@ class MNISTSource(DataSource):
         im_files = []
         numbers = []
 
-        for img, number in dataset:
-            with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as f:
-                img.save(f, format='JPEG')
+        for i, (img, number) in enumerate(dataset):
+            im_file = tmp_dir.joinpath(f'{self.split}-{i}.jpg')
+            img.save(im_file, format='JPEG')
 
-            im_files.append(f.name)
+            im_files.append(str(im_file))
             numbers.append(number)
 
         return im_files, numbers
 
+    def iter_samples(
+        self,
+        chunk_size: int,
+    ) -> Iterator[Tuple[list, Optional[list]]]:
+        dataset = MNIST(download=True, root=tempfile.gettempdir(), train=self.split == 'train')
+        tmp_dir = Path(tempfile.mkdtemp())
+
+        im_files = []
+        numbers = []
+
+        for i, (img, number) in enumerate(dataset):
+            im_file = tmp_dir.joinpath(f'{self.split}-{i}.jpg')
+            img.save(im_file, format='JPEG')
+
+            im_files.append(str(im_file))
+            numbers.append(number)
+
+            if len(im_files) == chunk_size:
+                yield im_files, numbers
+                im_files = []
+                numbers = []
+
+        if im_files:
+            yield im_files, numbers
+
+    def sample_ids(
+        self,
+        samples: list,
+    ) -> List[str]:
+        # Files are named after their index in the split, which stays stable across runs.
+        return [Path(sample).stem for sample in samples]
+
     def create_dataset(
         self,
         samples: list,
-        targets: list = None,
+        targets: Optional[list] = None,
     ) -> str:
-        tmp_dir = Path(tempfile.mkdtemp())
-        tmp_dir.mkdir(parents=True, exist_ok=True)
+        files = [
+            (sample, f'{targets[i]}/{Path(sample).name}' if targets else Path(sample).name)
+            for i, sample in enumerate(samples)
+        ]
+        return materialize(files)
+
+
+class MNISTPackedSource(PackedDataSource):
+    def __init__(
+        self,
+        split: str = 'train',
+    ):
+        if split not in ['train', 'test']:
+            raise ValueError('`split` must be `train` or `test`')
 
-        for i, sample in enumerate(samples):
-            if targets:
-                target = targets[i]
-                outdir = tmp_dir.joinpath(str(target))
-                outdir.mkdir(parents=True, exist_ok=True)
-                shutil.move(sample, outdir)
-            else:
-                shutil.move(sample, tmp_dir)
+        path = Path(tempfile.gettempdir()).joinpath('MNIST', 'packed', split)
+        super(MNISTPackedSource, self).__init__(path=str(path))
 
-        return str(tmp_dir)
+        if not path.joinpath(META_FILE).exists():
+            dataset = MNIST(download=True, root=tempfile.gettempdir(), train=split == 'train')
+            write_packed(str(path), dataset.data.numpy(), dataset.targets.tolist())
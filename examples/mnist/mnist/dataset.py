@@ -1,9 +1,12 @@
 from typing import Callable, List, Tuple, Union
 
+import numpy as np
 import torch
 from PIL import Image
 from torch.utils.data import Dataset
 
+from caml.sample_cache import SampleCache
+
 
 class MNISTDataset(Dataset):
     def __init__(
@@ -11,11 +14,13 @@ class MNISTDataset(Dataset):
         im_files: List[str],
         numbers: List[int] = None,
         transform: Callable = None,
+        cache: SampleCache = None,
     ):
         super(MNISTDataset, self).__init__()
         self.im_files = im_files
         self.numbers = numbers
         self.transform = transform
+        self.cache = cache
 
         if self.numbers is not None:
             assert len(self.im_files) == len(self.numbers)
@@ -23,9 +28,22 @@ class MNISTDataset(Dataset):
     def __len__(self) -> int:
         return len(self.im_files)
 
-    def __getitem__(self, idx: int) -> Union[Tuple[torch.Tensor], Tuple[torch.Tensor, int]]:
+    def decode(self, idx: int) -> np.ndarray:
         im_file = self.im_files[idx]
-        img = Image.open(im_file).convert('L')
+
+        # Packed datasets hold decoded pixel arrays instead of image paths.
+        if isinstance(im_file, np.ndarray):
+            return np.asarray(im_file)
+
+        return np.asarray(Image.open(im_file).convert('L'))
+
+    def __getitem__(self, idx: int) -> Union[Tuple[torch.Tensor], Tuple[torch.Tensor, int]]:
+        if self.cache is not None:
+            pixels = self.cache.get(idx, lambda: self.decode(idx))
+        else:
+            pixels = self.decode(idx)
+
+        img = Image.fromarray(pixels)
 
         if self.transform:
             img = self.transform(img)
@@ -14,6 +14,7 @@ def train(
     criterion,
     log_interval,
     epochs,
+    on_checkpoint=None,
 ):
     device = 'cuda' if torch.cuda.is_available() else 'cpu'
     model.to(device)
@@ -69,6 +70,17 @@ def train(
 
     evaluator.add_event_handler(Events.COMPLETED, best_model_saver, {'model': model})
 
+    if on_checkpoint is not None:
+        saved = []
+
+        @evaluator.on(Events.COMPLETED)
+        def report_checkpoint(engine):
+            checkpoint = best_model_saver.last_checkpoint
+
+            if checkpoint and checkpoint not in saved:
+                saved.append(checkpoint)
+                on_checkpoint(str(checkpoint))
+
     # kick everything off
     trainer.run(train_loader, max_epochs=epochs)
 
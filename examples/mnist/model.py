@@ -1,5 +1,6 @@
-from typing import Any, Optional, Tuple
+from typing import Any, Dict, Iterator, Optional, Tuple
 
+import numpy as np
 import torch
 from mnist import main
 from mnist.dataset import MNISTDataset
@@ -10,11 +11,16 @@ from torch.utils.data import DataLoader
 from torchvision import transforms
 
 from caml.model import EvalModel, TrainModel
+from caml.sample_cache import SampleCache
+
+# A decoded 28x28 digit takes 784 bytes, 832 once aligned in the cache arena.
+SAMPLE_BYTES = 832
 
 
 def get_data_loader(
     X: list,
     y: list = None,
+    cache: SampleCache = None,
     **kwargs: Any,
 ) -> DataLoader:
     transform = transforms.Compose([transforms.ToTensor(), transforms.Normalize((0.1307,), (0.3081,))])
@@ -22,6 +28,7 @@ def get_data_loader(
         im_files=X,
         numbers=y,
         transform=transform,
+        cache=cache,
     )
 
     loader = DataLoader(dataset, **kwargs)
@@ -35,6 +42,7 @@ class MNISTTrainModel(TrainModel):
         momentum: float = 0.9,
         num_epochs: int = 100,
         train_ratio: float = 0.8,
+        cache_bytes: int = 1 << 28,
         path: str = None,
         id_: str = None,
         **data_loader_kwargs: Any,
@@ -46,6 +54,7 @@ class MNISTTrainModel(TrainModel):
         self.num_epochs = num_epochs
         self.data_loader_kwargs = data_loader_kwargs
         self.train_ratio = train_ratio
+        self.cache_bytes = cache_bytes
         self.best_checkpoint = None
 
     def fit(
@@ -55,22 +64,41 @@ class MNISTTrainModel(TrainModel):
     ) -> None:
         train_loader, val_loader = self.get_data_loaders(X, y, self.train_ratio, **self.data_loader_kwargs)
 
-        self.best_checkpoint = main.train(
-            model=self.model,
-            train_loader=train_loader,
-            val_loader=val_loader,
-            optimizer=self.optimizer,
-            criterion=self.criterion,
-            log_interval=50,
-            epochs=self.num_epochs,
-        )
+        try:
+            self.best_checkpoint = main.train(
+                model=self.model,
+                train_loader=train_loader,
+                val_loader=val_loader,
+                optimizer=self.optimizer,
+                criterion=self.criterion,
+                log_interval=50,
+                epochs=self.num_epochs,
+                on_checkpoint=self.checkpoint,
+            )
+        finally:
+            for loader in (train_loader, val_loader):
+                if loader.dataset.cache is not None:
+                    loader.dataset.cache.close()
 
     def load_model(self, path: str) -> None:
         self.model.load_state_dict(torch.load(path))
 
+    def state(self) -> Dict[str, torch.Tensor]:
+        return self.model.state_dict()
+
+    def load_state(self, state: Dict[str, torch.Tensor]) -> None:
+        self.model.load_state_dict(state)
+
     def best_model(self) -> Optional[str]:
         return self.best_checkpoint
 
+    def create_cache(self, n_items: int) -> Optional[SampleCache]:
+        if not self.cache_bytes or not n_items:
+            return None
+
+        # Decoded digits are cached so later epochs and the per-epoch evaluation skip image decoding.
+        return SampleCache(n_items=n_items, max_bytes=min(self.cache_bytes, n_items * SAMPLE_BYTES))
+
     def get_data_loaders(
         self,
         X: list,
@@ -83,8 +111,20 @@ class MNISTTrainModel(TrainModel):
         val_split_X = X[round(len(X) * train_ratio):]
         val_split_y = y[round(len(X) * train_ratio):]
 
-        train_loader = get_data_loader(train_split_X, train_split_y, shuffle=True, **kwargs)
-        val_loader = get_data_loader(val_split_X, val_split_y, shuffle=False, **kwargs)
+        train_loader = get_data_loader(
+            train_split_X,
+            train_split_y,
+            cache=self.create_cache(len(train_split_X)),
+            shuffle=True,
+            **kwargs,
+        )
+        val_loader = get_data_loader(
+            val_split_X,
+            val_split_y,
+            cache=self.create_cache(len(val_split_X)),
+            shuffle=False,
+            **kwargs,
+        )
 
         return train_loader, val_loader
 
@@ -119,26 +159,108 @@ class MNISTEvalModel(EvalModel):
     def predict_proba(
         self,
         X: list,
-    ) -> list:
+    ) -> np.ndarray:
         loader = get_data_loader(X, **self.data_loader_kwargs)
-        preds = []
+        preds = np.empty((len(X), self.model.fc2.out_features), dtype=np.float32)
+        start = 0
 
         with torch.no_grad():
             for img, in iter(loader):
-                pred = self.model(img)
-                preds.extend(pred.tolist())
+                pred = self.model(img).exp()
+                preds[start:start + len(pred)] = pred.numpy()
+                start += len(pred)
 
         return preds
 
+    def predict_batches(
+        self,
+        X: list,
+        batch_size: int = 1024,
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        loader = get_data_loader(X, **{**self.data_loader_kwargs, 'batch_size': batch_size})
+        start = 0
+
+        with torch.no_grad():
+            for img, in iter(loader):
+                pred = self.model(img).exp().numpy()
+                yield start, pred
+                start += len(pred)
+
+    def predict_proba_samples(
+        self,
+        X: list,
+        n_passes: int,
+    ) -> np.ndarray:
+        loader = get_data_loader(X, **self.data_loader_kwargs)
+        preds = np.empty((len(X), n_passes, self.model.fc2.out_features), dtype=np.float32)
+        start = 0
+        # MNISTNet has no batch norm, so train mode only switches dropout on.
+        self.model.train()
+
+        try:
+            with torch.no_grad():
+                for img, in iter(loader):
+                    # Repeat each image along a pass axis so all passes run in one forward call.
+                    imgs = img.unsqueeze(1).expand(-1, n_passes, *img.shape[1:]).reshape(-1, *img.shape[1:])
+                    pred = self.model(imgs).exp().view(len(img), n_passes, -1)
+                    preds[start:start + len(pred)] = pred.numpy()
+                    start += len(pred)
+        finally:
+            self.model.eval()
+
+        return preds
+
+    def embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        loader = get_data_loader(X, **self.data_loader_kwargs)
+        embeddings = np.empty((len(X), self.model.fc1.out_features), dtype=np.float32)
+        start = 0
+
+        with torch.no_grad():
+            for img, in iter(loader):
+                embedding = self.model.embed(img)
+                embeddings[start:start + len(embedding)] = embedding.numpy()
+                start += len(embedding)
+
+        return embeddings
+
+    def grad_embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        loader = get_data_loader(X, **self.data_loader_kwargs)
+        n_classes = self.model.fc2.out_features
+        embeddings = np.empty((len(X), n_classes * self.model.fc1.out_features), dtype=np.float32)
+        start = 0
+
+        with torch.no_grad():
+            for img, in iter(loader):
+                hidden = self.model.embed(img)
+                proba = self.model.fc2(hidden).softmax(dim=-1)
+                # Gradient of the cross-entropy w.r.t. fc2 weights, taking the predicted class as the label.
+                proba[torch.arange(len(proba)), proba.argmax(dim=-1)] -= 1
+                embedding = (proba.unsqueeze(2) * hidden.unsqueeze(1)).flatten(start_dim=1)
+                embeddings[start:start + len(embedding)] = embedding.numpy()
+                start += len(embedding)
+
+        return embeddings
+
     def eval(
         self,
         pred: list,
         y: list,
     ) -> Tuple[str, float]:
         assert len(pred) == len(y)
-        n_trues = sum([_pred == _y for _pred, _y in zip(pred, y)])
-        acc = n_trues / len(y)
+        acc = float(np.mean(np.asarray(pred) == np.asarray(y)))
         return 'accuracy', acc
 
     def load_model(self, path: str) -> None:
         self.model.load_state_dict(torch.load(path))
+
+    def state(self) -> Dict[str, torch.Tensor]:
+        return self.model.state_dict()
+
+    def load_state(self, state: Dict[str, torch.Tensor]) -> None:
+        self.model.load_state_dict(state)
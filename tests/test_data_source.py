@@ -0,0 +1,74 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from caml.data_source import DataSource, IndexedDataSource
+
+
+class ArraySource(DataSource):
+    def samples(self) -> Tuple[list, Optional[list]]:
+        return [], None
+
+    def create_dataset(
+        self,
+        samples: list,
+        targets: Optional[list] = None,
+    ) -> str:
+        return ''
+
+
+def test_sample_ids_distinguish_large_arrays():
+    samples = np.random.default_rng(0).random((1000, 3, 32, 32)).astype(np.float32)
+    ids = ArraySource().sample_ids(samples)
+
+    assert len(set(ids)) == len(samples)
+
+
+def test_sample_ids_are_content_based():
+    source = ArraySource()
+    sample = np.arange(3 * 32 * 32, dtype=np.uint8).reshape(3, 32, 32)
+
+    assert source.sample_ids([sample]) == source.sample_ids([sample.copy()])
+    assert source.sample_ids([sample]) != source.sample_ids([sample.reshape(32, 96)])
+    assert source.sample_ids([sample]) != source.sample_ids([sample.astype(np.int8)])
+
+
+def test_sample_ids_keep_plain_samples_readable():
+    assert ArraySource().sample_ids(['a.jpg', 3]) == ['a.jpg', '3']
+
+
+class IndexedSource(IndexedDataSource):
+    def __init__(
+        self,
+        n: int,
+    ):
+        super(IndexedSource, self).__init__()
+        self.n = n
+        self.read: list = []
+
+    def __len__(self) -> int:
+        return self.n
+
+    def get_item(
+        self,
+        index: int,
+    ) -> Tuple[int, int]:
+        self.read.append(index)
+        return index, index % 2
+
+    def create_dataset(
+        self,
+        samples: list,
+        targets: Optional[list] = None,
+    ) -> str:
+        return ''
+
+
+def test_indexed_source_streams_chunks():
+    source = IndexedSource(5)
+    chunks = source.iter_samples(2)
+
+    assert next(chunks) == ([0, 1], [0, 1])
+    assert source.read == [0, 1]
+    assert list(chunks) == [([2, 3], [0, 1]), ([4], [0])]
+    assert source.samples() == ([0, 1, 2, 3, 4], [0, 1, 0, 1, 0])
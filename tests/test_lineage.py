@@ -0,0 +1,64 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from caml.backend import LocalBackend, set_backend
+from caml.lineage import labelled_ids, merge_view, write_lineage
+
+
+def write_round(
+    root: Path,
+    names: list,
+) -> str:
+    root.mkdir()
+
+    for name in names:
+        root.joinpath(name).parent.mkdir(parents=True, exist_ok=True)
+        root.joinpath(name).write_text(name)
+
+    return str(root)
+
+
+def test_merge_view_combines_rounds(tmp_path):
+    first = write_round(tmp_path.joinpath('first'), ['0/a.jpg', '1/b.jpg'])
+    second = write_round(tmp_path.joinpath('second'), ['0/c.jpg'])
+    view = Path(merge_view([first, second]))
+    files = [p for p in view.rglob('*') if p.is_file()]
+
+    assert sorted(p.relative_to(view).as_posix() for p in files) == [
+        '0/a.jpg',
+        '0/c.jpg',
+        '1/b.jpg',
+    ]
+
+
+def test_merge_view_rejects_colliding_files(tmp_path):
+    first = write_round(tmp_path.joinpath('first'), ['data.bin'])
+    second = write_round(tmp_path.joinpath('second'), ['data.bin'])
+
+    with pytest.raises(ValueError):
+        merge_view([first, second])
+
+
+def test_labelled_ids_read_only_the_parent_round(tmp_path, monkeypatch):
+    monkeypatch.setenv('CAML_CACHE', '0')
+    backend = LocalBackend(root=str(tmp_path))
+    set_backend(backend)
+    parent = None
+
+    try:
+        for ids in (['a', 'b'], ['c'], ['d']):
+            writer = backend.create_dataset()
+            writer.add_files(write_lineage(ids, parent=parent))
+            writer.upload()
+            parent = writer.finalize()
+
+        # Earlier rounds are no longer needed once their ids are recorded in their descendants.
+        for path in sorted(tmp_path.joinpath('datasets').iterdir()):
+            if path.name != parent and path.is_dir():
+                shutil.rmtree(path)
+
+        assert labelled_ids(parent) == {'a', 'b', 'c', 'd'}
+    finally:
+        set_backend(None)
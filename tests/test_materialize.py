@@ -0,0 +1,33 @@
+import shutil
+
+from caml.materialize import (PRUNE_STAMP, hash_files, manifest_path,
+                              materialize)
+
+
+def test_manifest_is_kept_outside_the_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('CAML_MANIFEST_DIR', str(tmp_path.joinpath('manifests')))
+    source = tmp_path.joinpath('source')
+    source.mkdir()
+    source.joinpath('a.bin').write_bytes(b'a')
+
+    output = materialize([(str(source.joinpath('a.bin')), 'a.bin')], output_dir=str(tmp_path.joinpath('output')))
+    hash_files(output)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['manifests', 'output', 'source']
+    assert [p.name for p in tmp_path.joinpath('output').iterdir()] == ['a.bin']
+    assert manifest_path(output).exists()
+
+
+def test_manifests_of_removed_directories_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setenv('CAML_MANIFEST_DIR', str(tmp_path.joinpath('manifests')))
+    source = tmp_path.joinpath('source')
+    source.mkdir()
+    source.joinpath('a.bin').write_bytes(b'a')
+    first = materialize([(str(source.joinpath('a.bin')), 'a.bin')], output_dir=str(tmp_path.joinpath('first')))
+    shutil.rmtree(first)
+
+    tmp_path.joinpath('manifests', PRUNE_STAMP).unlink()
+    second = materialize([(str(source.joinpath('a.bin')), 'a.bin')], output_dir=str(tmp_path.joinpath('second')))
+
+    assert not manifest_path(first).exists()
+    assert manifest_path(second).exists()
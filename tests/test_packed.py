@@ -0,0 +1,31 @@
+import numpy as np
+
+from caml.packed import ShardedSamples, load_packed, write_packed
+
+
+def test_load_packed_indexes_across_shards(tmp_path):
+    first = np.random.rand(10, 3)
+    second = np.random.rand(7, 3)
+    write_packed(str(tmp_path.joinpath('a')), first)
+    write_packed(str(tmp_path.joinpath('b')), second)
+    write_packed(str(tmp_path.joinpath('c')), np.empty((0, 3)))
+
+    X, _ = load_packed(str(tmp_path))
+    expected = np.concatenate([first, second])
+
+    assert isinstance(X, ShardedSamples)
+    assert len(X) == len(expected)
+    assert all(np.array_equal(X[i], expected[i]) for i in range(-len(X), len(X)))
+    assert np.array_equal(X[5:12], expected[5:12])
+    assert np.array_equal(np.stack(X[3:16:2]), expected[3:16:2])
+    assert np.array_equal(np.stack(list(X)), expected)
+
+
+def test_load_packed_indexes_records_across_shards(tmp_path):
+    write_packed(str(tmp_path.joinpath('a')), [b'ab', b'c'])
+    write_packed(str(tmp_path.joinpath('b')), [b'def'])
+
+    X, _ = load_packed(str(tmp_path))
+
+    assert [bytes(sample) for sample in X] == [b'ab', b'c', b'def']
+    assert [bytes(sample) for sample in X[1:3]] == [b'c', b'def']
@@ -0,0 +1,65 @@
+import numpy as np
+
+from caml.model import EvalModel
+from caml.strategy.strategy import Strategy
+
+
+class LookupModel(EvalModel):
+    def __init__(
+        self,
+        n: int,
+        n_classes: int = 4,
+        dim: int = 2,
+    ):
+        super(LookupModel, self).__init__()
+        rng = np.random.default_rng(0)
+        logits = np.repeat(rng.normal(size=(n // 2, n_classes)), 2, axis=0)
+        logits += rng.normal(scale=1e-3, size=logits.shape)
+        self.proba = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        # Samples come in near-identical pairs, so the top scores always include near-duplicates.
+        self.embeddings = np.repeat(rng.normal(size=(n // 2, dim)), 2, axis=0)
+
+    def load_model(
+        self,
+        path: str,
+    ) -> None:
+        pass
+
+    def predict(
+        self,
+        X: list,
+    ) -> list:
+        return self.proba[X].argmax(axis=1).tolist()
+
+    def predict_proba(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        return self.proba[X]
+
+    def embed(
+        self,
+        X: list,
+    ) -> np.ndarray:
+        return self.embeddings[X]
+
+    def eval(
+        self,
+        pred: list,
+        y: list,
+    ):
+        return 'accuracy', 0.0
+
+
+def test_query_stream_applies_dedup_like_query():
+    n = 400
+    model = LookupModel(n)
+    pool = list(range(n))
+    strategy = Strategy.get('entropy', dedup_radius=1e-3)
+
+    expected = [pool[i] for i in strategy.query(pool, 20, model)]
+    chunks = ((pool[start:start + 64], None) for start in range(0, n, 64))
+    selected, _ = strategy.query_stream(chunks, 20, model)
+
+    assert selected == expected
+    assert len({tuple(model.embeddings[i]) for i in selected}) == len(selected)